@@ -0,0 +1,175 @@
+import pygame  # Import Pygame for game development
+from settings import *  # Import game settings
+from support import import_folder, convert_image  # Import the image loading helpers
+from atlas import load_atlas  # Import the texture atlas loader
+
+class SilentSound:
+    """Stand-in for pygame.mixer.Sound used when the mixer is not initialized (headless mode)."""
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+    def get_volume(self):
+        return 0.0
+
+    def get_num_channels(self):
+        return 0
+
+def tint_variant(color):
+    """Return a variant builder that multiplies a frame's colors by the given color."""
+    def tint(surface):
+        tinted = surface.copy()
+        tinted.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+        return tinted
+    return tint
+
+# Frame variants the asset cache can build: name -> function taking a frame and returning the variant
+frame_variants = {}
+
+def register_variant(name, builder):
+    """Make a new frame variant available to AssetCache.folder, e.g. register_variant('frozen', tint_variant('#88ccff'))."""
+    frame_variants[name] = builder
+
+class AssetCache:
+    def __init__(self):
+        """
+        Initialize a keyed cache of loaded images, image folders and sounds.
+
+        Images are keyed by path, convert mode and size, folders by path and frame variant,
+        and sounds by path, so every sprite that asks for the same asset shares one loaded copy.
+        """
+        self.images = {}  # (path, alpha, size) -> Surface
+        self.folders = {}  # (path, variant) -> list of Surfaces
+        self.sounds = {}  # path -> Sound
+        self.atlas = None  # Texture atlas, loaded on first use; False if disabled or unavailable
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def get_atlas(self):
+        """Return the texture atlas, loading (and if needed building) it on first use, or None."""
+        if self.atlas is None:
+            self.atlas = (load_atlas() if ATLAS_ENABLED else None) or False
+        return self.atlas or None
+
+    def image(self, path, alpha=True, size=None):
+        """
+        Return the image at the given path.
+
+        Parameters:
+        - path: Path to the image file.
+        - alpha: Convert with per-pixel alpha (convert_alpha) if True, otherwise use convert.
+        - size: Optional (width, height) to scale the image to.
+        """
+        key = (path, alpha, size)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        atlas = self.get_atlas()
+        if size is not None:
+            # Scaled variants are built from the cached full-size image
+            surface = pygame.transform.scale(self.image(path, alpha), size)
+        elif alpha and atlas is not None and path in atlas:
+            surface = atlas.frame(path)
+        else:
+            surface = convert_image(pygame.image.load(path), alpha)
+        self.images[key] = surface
+        return surface
+
+    def folder(self, path, variant=None):
+        """
+        Return the list of images in the given folder.
+        The list and its surfaces are shared, so callers must not modify them.
+
+        Parameters:
+        - path: Path to the folder.
+        - variant: Name of a pre-baked frame variant registered in frame_variants (see register_variant),
+          or None for the images as loaded. Variants are built once from the loaded images.
+        """
+        key = (path, variant)
+        surfaces = self.folders.get(key)
+        if surfaces is not None:
+            self.hits += 1
+            return surfaces
+
+        self.misses += 1
+        atlas = self.get_atlas()
+        if variant is not None:
+            build = frame_variants[variant]
+            surfaces = [build(surface) for surface in self.folder(path)]
+        elif atlas is not None and path in atlas:
+            surfaces = atlas.folder(path)
+        else:
+            surfaces = import_folder(path)
+        self.folders[key] = surfaces
+        return surfaces
+
+    def sound(self, path):
+        """
+        Return the sound at the given path.
+        The Sound object is shared, so its volume applies to every user.
+        Returns a SilentSound when the mixer is not initialized.
+        """
+        sound = self.sounds.get(path)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        sound = pygame.mixer.Sound(path) if pygame.mixer.get_init() else SilentSound()
+        self.sounds[path] = sound
+        return sound
+
+    def add_image(self, path, surface, alpha=True):
+        """Store an image loaded elsewhere (e.g. by the startup loader) so later requests for it are hits."""
+        self.images[(path, alpha, None)] = surface
+
+    def add_folder(self, path, surfaces):
+        """Store a folder of images loaded elsewhere (e.g. by the startup loader) so later requests for it are hits."""
+        self.folders[(path, None)] = surfaces
+
+    def add_sound(self, path, sound):
+        """Store a sound loaded elsewhere (e.g. by the startup loader) so later requests for it are hits."""
+        self.sounds[path] = sound
+
+    def evict(self, path=None):
+        """
+        Drop cached assets so they are reloaded on next use.
+
+        Parameters:
+        - path: Drop only the assets loaded from this path. Drops everything if None.
+        """
+        if path is None:
+            self.images.clear()
+            self.folders.clear()
+            self.sounds.clear()
+            return
+
+        for key in [key for key in self.images if key[0] == path]:
+            del self.images[key]
+        for key in [key for key in self.folders if key[0] == path]:
+            del self.folders[key]
+        self.sounds.pop(path, None)
+
+    def stats(self):
+        """Return the hit and miss counters and the number of cached entries."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'images': len(self.images),
+            'folders': len(self.folders),
+            'sounds': len(self.sounds)
+        }
+
+# Process-wide cache shared by every sprite, the UI and the upgrade menu
+asset_cache = AssetCache()
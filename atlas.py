@@ -0,0 +1,168 @@
+import pygame  # Import Pygame for game development
+import os  # Import OS module for interacting with the operating system
+import json  # Import json to read and write the atlas index
+import hashlib  # Import hashlib to key the atlas by its source files
+from settings import *  # Import game settings
+from support import natural_key, convert_image  # Import the image helpers
+
+ATLAS_VERSION = 1  # Bump when the sheet or index layout changes
+
+def normalize_path(path):
+    """Return a path in the form used as an atlas key, e.g. 'graphics/player/down'."""
+    return os.path.normpath(path).replace(os.sep, '/')
+
+def find_frames(roots=ATLAS_FOLDERS):
+    """
+    Find the images to pack.
+    Returns a dictionary of folder -> image paths, both normalized and in natural sort order.
+    """
+    folders = {}
+    for root in roots:
+        for folder, directories, files in os.walk(root):
+            directories.sort(key=natural_key)
+            images = sorted((name for name in files if name.lower().endswith('.png')), key=natural_key)
+            if images:
+                folders[normalize_path(folder)] = [normalize_path(os.path.join(folder, name)) for name in images]
+    return folders
+
+def source_hash(folders):
+    """Return a hash of the image paths, sizes and modification times and the atlas settings."""
+    digest = hashlib.sha1(f'{ATLAS_VERSION},{ATLAS_SHEET_SIZE},{ATLAS_PADDING}'.encode())
+    for paths in folders.values():
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(f'{path},{stat.st_size},{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()
+
+def pack(sizes, sheet_size=ATLAS_SHEET_SIZE, padding=ATLAS_PADDING):
+    """
+    Pack rectangles into square sheets with a shelf packer, tallest first.
+
+    Parameters:
+    - sizes: Dictionary of key -> (width, height).
+    Returns a dictionary of key -> (sheet, x, y) and the number of sheets.
+    """
+    placements = {}
+    sheet, x, y, shelf_height = 0, 0, 0, 0
+    for key, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if width > sheet_size or height > sheet_size:
+            raise ValueError(f"Image {key} is larger than an atlas sheet ({sheet_size}x{sheet_size})")
+        if x + width > sheet_size:
+            # Start a new shelf below the current one
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        if y + height > sheet_size:
+            # Start a new sheet
+            sheet, x, y, shelf_height = sheet + 1, 0, 0, 0
+        placements[key] = (sheet, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return placements, (sheet + 1 if placements else 0)
+
+def sheet_path(directory, number):
+    """Return the file path of an atlas sheet."""
+    return os.path.join(directory, f'sheet_{number}.bmp')
+
+def build_atlas(folders, directory, source):
+    """
+    Pack the images of the given folders into sheet files and write the index.
+    Returns the index.
+    """
+    images = {path: pygame.image.load(path) for paths in folders.values() for path in paths}
+    placements, sheet_count = pack({path: image.get_size() for path, image in images.items()})
+
+    # Sheets only grow as large as their contents
+    extents = [[0, 0] for _ in range(sheet_count)]
+    for path, (sheet, x, y) in placements.items():
+        width, height = images[path].get_size()
+        extents[sheet][0] = max(extents[sheet][0], x + width)
+        extents[sheet][1] = max(extents[sheet][1], y + height)
+    sheets = [pygame.Surface(extent, pygame.SRCALPHA, 32) for extent in extents]
+
+    frames = {}
+    for path, (sheet, x, y) in placements.items():
+        image = images[path]
+        if image.get_flags() & pygame.SRCALPHA:
+            # Sheets start fully transparent, so the max blend copies the pixels exactly
+            sheets[sheet].blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        else:
+            # Opaque images are copied as is, leaving their colorkey pixels transparent
+            sheets[sheet].blit(image, (x, y))
+        frames[path] = [sheet, x, y, image.get_width(), image.get_height()]
+
+    # Sheets are stored uncompressed: they are only a cache, and BMP loads several times faster than PNG
+    os.makedirs(directory, exist_ok=True)
+    for number, sheet in enumerate(sheets):
+        pygame.image.save(sheet, sheet_path(directory, number))
+
+    index = {'version': ATLAS_VERSION, 'source': source, 'sheets': sheet_count, 'folders': folders, 'frames': frames}
+    # The index is written last so an interrupted build is redone next time
+    with open(os.path.join(directory, 'index.json'), 'w') as index_file:
+        json.dump(index, index_file)
+    return index
+
+class TextureAtlas:
+    def __init__(self, directory, index, sheets=None):
+        """
+        Initialize an atlas from its sheet files and index.
+
+        Each sheet is loaded once; frames are subsurfaces of their sheet, so they share its pixels.
+
+        Parameters:
+        - directory: Directory holding the sheet files.
+        - index: Atlas index as written by build_atlas.
+        - sheets: Sheet surfaces that were already loaded, e.g. by the startup loader. Loaded from disk if None.
+        """
+        self.folders = index['folders']
+        self.frames = index['frames']
+        if sheets is None:
+            sheets = [pygame.image.load(sheet_path(directory, number)) for number in range(index['sheets'])]
+        self.sheets = [convert_image(sheet) for sheet in sheets]
+
+    def __contains__(self, path):
+        path = normalize_path(path)
+        return path in self.frames or path in self.folders
+
+    def frame(self, path):
+        """Return the image at the given path as a subsurface of its sheet."""
+        sheet, x, y, width, height = self.frames[normalize_path(path)]
+        return self.sheets[sheet].subsurface((x, y, width, height))
+
+    def folder(self, path):
+        """Return the images of a folder in natural sort order."""
+        return [self.frame(frame_path) for frame_path in self.folders[normalize_path(path)]]
+
+def prepare_atlas(directory=ATLAS_DIR, roots=ATLAS_FOLDERS):
+    """
+    Make sure the atlas sheets are up to date, building them if they are missing or the source images changed.
+    Returns the atlas index, or None if the atlas cannot be written.
+    """
+    folders = find_frames(roots)
+    source = source_hash(folders)
+
+    index = None
+    index_path = os.path.join(directory, 'index.json')
+    if os.path.exists(index_path):
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+    if index is None or index.get('source') != source:
+        try:
+            index = build_atlas(folders, directory, source)
+        except (OSError, pygame.error):
+            return None
+    return index
+
+def load_atlas(directory=ATLAS_DIR, roots=ATLAS_FOLDERS):
+    """
+    Load the texture atlas, building it first if needed.
+    Returns None if the atlas cannot be written.
+    """
+    index = prepare_atlas(directory, roots)
+    return TextureAtlas(directory, index) if index is not None else None
+
+if __name__ == '__main__':
+    # Build the atlas ahead of time and print a summary
+    pygame.init()
+    atlas = load_atlas()
+    print(f"{len(atlas.frames)} images from {len(atlas.folders)} folders packed into {len(atlas.sheets)} sheets:")
+    for number, sheet in enumerate(atlas.sheets):
+        print(f"  sheet_{number}.bmp: {sheet.get_width()}x{sheet.get_height()}")
@@ -0,0 +1,108 @@
+import pygame  # Import Pygame for game development
+from math import hypot  # Import hypot for listener distance calculations
+from settings import *  # Import game settings
+from assets import asset_cache  # Import the shared asset cache
+
+class AudioManager:
+    def __init__(self):
+        """
+        Initialize the audio manager that plays every sound effect in the game.
+
+        Sounds are named entries of sound_data, loaded once with their volume set once.
+        A sound only plays if it was not triggered within the dedupe window, it has a free voice
+        and the mixer has a free channel; sounds with a position fade out with distance from the listener.
+        """
+        self.sounds = {}  # name -> Sound, filled by preload
+        self.last_played = {}  # name -> time the sound last started, in milliseconds
+        self.listener = None  # Sprite whose position sounds are heard from
+
+        # Statistics
+        self.played = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        """Whether sounds can be played (the mixer is not initialized in headless mode)."""
+        return pygame.mixer.get_init() is not None
+
+    def preload(self):
+        """
+        Load every sound in sound_data and set up the mixer's channel budget.
+        """
+        if self.sounds or not self.enabled:
+            return
+        pygame.mixer.set_num_channels(AUDIO_CHANNELS)
+
+        for name, info in sound_data.items():
+            sound = asset_cache.sound(info['path'])
+            sound.set_volume(info['volume'])
+            self.sounds[name] = sound
+
+    def set_listener(self, sprite):
+        """Hear positioned sounds from the given sprite, usually the player."""
+        self.listener = sprite
+
+    def play_music(self, path, volume):
+        """
+        Loop a music track. Music is streamed from the file instead of decoded up front,
+        and plays outside the effect channels, so effects can never cut it off.
+        """
+        if not self.enabled:
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops=-1)
+
+    def play(self, name, pos=None):
+        """
+        Play a sound effect.
+
+        Parameters:
+        - name: Name of the sound in sound_data.
+        - pos: Position the sound comes from, or None for sounds that are always heard at full volume.
+        Returns the channel the sound plays on, or None if it was skipped.
+        """
+        if not self.enabled:
+            return None
+        self.preload()
+
+        # Dedupe repeated triggers of the same sound
+        current_time = pygame.time.get_ticks()
+        last_time = self.last_played.get(name)
+        if last_time is not None and current_time - last_time < AUDIO_DEDUPE_WINDOW:
+            self.skipped += 1
+            return None
+
+        # Attenuate by distance, culling sounds out of earshot
+        volume = 1.0
+        if pos is not None and self.listener is not None and AUDIO_HEARING_RADIUS:
+            listener_x, listener_y = self.listener.rect.center
+            distance = hypot(pos[0] - listener_x, pos[1] - listener_y)
+            if distance >= AUDIO_HEARING_RADIUS:
+                self.skipped += 1
+                return None
+            if AUDIO_ATTENUATION:
+                volume = 1.0 - distance / AUDIO_HEARING_RADIUS
+
+        # Limit the voices of this sound and the channels of all sounds
+        sound = self.sounds[name]
+        if sound.get_num_channels() >= sound_data[name]['voices']:
+            self.skipped += 1
+            return None
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            self.skipped += 1
+            return None
+
+        channel.set_volume(volume)
+        channel.play(sound)
+        self.last_played[name] = current_time
+        self.played += 1
+        return channel
+
+    def stats(self):
+        """Return the number of sounds played and skipped."""
+        return {'played': self.played, 'skipped': self.skipped}
+
+# Shared audio manager used by the player, enemies and magic
+audio_manager = AudioManager()
@@ -0,0 +1,250 @@
+"""
+Frame time benchmarks for Level.run.
+Builds synthetic levels with a given map size, enemy count, obstacle count and particle count,
+times each frame and the profiler sections Level.run records, and writes the results as JSON
+so runs can be compared over time.
+
+Usage:
+    python benchmark.py [--frames N] [--scenario NAME ...] [--output PATH] [--compare PATH]
+"""
+
+import os
+
+# Render to an off-screen surface and discard audio so the benchmark runs anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame, sys, time, json, random, argparse, platform, tracemalloc
+from array import array  # Import array for building synthetic layers
+from settings import *  # Import game settings
+from level import Level  # Import the Level class
+from level_data import LevelLayer, load_level  # Import the level layer helpers
+from controls import ScriptedInput  # Import the scripted input source
+from profiler import profiler  # Import the frame profiler whose sections time the phases
+
+# Benchmark scenarios: map size in tiles, enemies, obstacle tiles and live particles
+SCENARIOS = [
+    {'name': 'level_0', 'map': None, 'enemies': None, 'obstacles': None, 'particles': 0},
+    {'name': 'small', 'map': (100, 94), 'enemies': 40, 'obstacles': 1600, 'particles': 0},
+    {'name': 'crowded', 'map': (100, 94), 'enemies': 400, 'obstacles': 1600, 'particles': 0},
+    {'name': 'large', 'map': (400, 400), 'enemies': 400, 'obstacles': 25000, 'particles': 0},
+    {'name': 'particles', 'map': (100, 94), 'enemies': 40, 'obstacles': 1600, 'particles': 300},
+    {'name': 'stress', 'map': (400, 400), 'enemies': 2000, 'obstacles': 25000, 'particles': 300}
+]
+
+MONSTER_IDS = [27, 29, 32, 33, 34, 35]  # Tile ids of the monster types in the entities layer
+PLAYER_ID = 167  # Tile id of the player in the entities layer
+PLAYER_POS = (1220, 570)  # Position the level creates the player at
+
+def build_synthetic_layouts(width, height, enemies, obstacles, seed=0):
+    """
+    Build level layers with a boundary wall, scattered obstacle tiles, trees and enemies.
+    The area around the player start is kept clear.
+    """
+    rng = random.Random(seed)
+    layers = {name: array('i', [-1]) * (width * height) for name in ('boundary', 'entities', 'trees')}
+    player_col, player_row = PLAYER_POS[0] // TILESIZE, PLAYER_POS[1] // TILESIZE
+    occupied = set()
+
+    def free_cell():
+        while True:
+            col, row = rng.randrange(1, width - 1), rng.randrange(1, height - 1)
+            if (col, row) not in occupied and max(abs(col - player_col), abs(row - player_row)) > 3:
+                occupied.add((col, row))
+                return row * width + col
+
+    # Boundary wall around the map
+    for col in range(width):
+        layers['boundary'][col] = 220
+        layers['boundary'][(height - 1) * width + col] = 220
+    for row in range(height):
+        layers['boundary'][row * width] = 220
+        layers['boundary'][row * width + width - 1] = 220
+
+    # Scattered obstacles, one in eight of them a tree
+    for index in range(obstacles):
+        if index % 8 == 0:
+            layers['trees'][free_cell()] = rng.randrange(5)
+        else:
+            layers['boundary'][free_cell()] = 220
+
+    layers['entities'][player_row * width + player_col] = PLAYER_ID
+    for index in range(enemies):
+        layers['entities'][free_cell()] = MONSTER_IDS[index % len(MONSTER_IDS)]
+
+    return {name: LevelLayer(name, width, height, cells) for name, cells in layers.items()}
+
+def walking_script(seed=0):
+    """Yield the keys held on each tick: the player walks a loop and attacks now and then."""
+    rng = random.Random(seed)
+    directions = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w]
+    while True:
+        for direction in directions:
+            for _ in range(rng.randint(40, 120)):
+                pressed = [direction]
+                if rng.random() < 0.05:
+                    pressed.append(pygame.K_SPACE)
+                yield pressed
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(values):
+    """Return the mean and p50/p95/p99 of a list of values."""
+    return {
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99)
+    }
+
+class FrameBenchmark:
+    def __init__(self, scenario, seed=0):
+        """
+        Initialize a level for a benchmark scenario.
+        """
+        self.scenario = scenario
+        if scenario['map'] is None:
+            layouts = load_level(level_layers)
+        else:
+            width, height = scenario['map']
+            layouts = build_synthetic_layouts(width, height, scenario['enemies'], scenario['obstacles'], seed)
+
+        self.level = Level(input_source=ScriptedInput(walking_script(seed)), layouts=layouts)
+        self.level.animation_player.pool.reserve(scenario['particles'])
+        self.rng = random.Random(seed)
+        profiler.enabled = True  # The phases are timed by the level's own profiler sections
+
+    def spawn_particles(self):
+        """Top up the live particles to the scenario's particle count."""
+        level = self.level
+        live = sum(1 for sprite in level.visible_sprites if getattr(sprite, 'sprite_type', None) == 'magic')
+        for _ in range(self.scenario['particles'] - live):
+            x = level.player.rect.centerx + self.rng.randint(-600, 600)
+            y = level.player.rect.centery + self.rng.randint(-340, 340)
+            level.animation_player.create_particles('flame', (x, y), [level.visible_sprites])
+
+    def frame(self, timings):
+        """
+        Run one frame of the level, recording the frame time and the time of each profiler section
+        in milliseconds. Sections that did not run in the frame (e.g. the upgrade menu) are not recorded.
+        """
+        level = self.level
+        clock = time.perf_counter
+
+        self.spawn_particles()
+
+        profiler.begin_frame()
+        start = clock()
+        level.run()
+        end = clock()
+        sections = profiler.frame['times']
+        profiler.end_frame()
+        pygame.display.update()
+
+        timings['frame'].append((end - start) * 1000)
+        for name, value in sections.items():
+            timings.setdefault(name, []).append(value)
+
+        # Keep the player alive so every frame measures the same level
+        level.player.health = level.player.stats['health']
+
+    def run(self, frames, warmup):
+        """
+        Time the given number of frames after a warmup, then measure allocations in a separate pass.
+        Returns a dictionary of results.
+        """
+        timings = {'frame': []}
+        for _ in range(warmup):
+            self.frame({'frame': []})
+        for _ in range(frames):
+            self.frame(timings)
+
+        # Allocation tracing slows frames down, so it is measured on its own
+        allocated_bytes = []
+        allocated_blocks = []
+        tracemalloc.start()
+        for _ in range(min(frames, 60)):
+            blocks = sys.getallocatedblocks()
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self.frame({'frame': []})
+            allocated_bytes.append(tracemalloc.get_traced_memory()[1] - current)
+            allocated_blocks.append(sys.getallocatedblocks() - blocks)
+        tracemalloc.stop()
+
+        level = self.level
+        return {
+            'scenario': self.scenario,
+            'frames': frames,
+            'sprites': len(level.visible_sprites),
+            'obstacles': len(level.obstacle_sprites),
+            'phases_ms': {phase: summarize(values) for phase, values in timings.items()},
+            'allocations_per_frame': {
+                'peak_bytes': summarize(allocated_bytes),
+                'net_blocks': summarize(allocated_blocks)
+            }
+        }
+
+def compare(results, previous):
+    """Print the change in p50 and p95 frame time against a previous results file."""
+    old = {entry['scenario']['name']: entry for entry in previous['results']}
+    for entry in results['results']:
+        name = entry['scenario']['name']
+        if name not in old:
+            continue
+        for stat in ('p50', 'p95'):
+            before = old[name]['phases_ms']['frame'][stat]
+            after = entry['phases_ms']['frame'][stat]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{name:>10} frame {stat}: {before:7.3f} ms -> {after:7.3f} ms ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the frame time of Level.run.')
+    parser.add_argument('--frames', type=int, default=300, help='frames to time per scenario')
+    parser.add_argument('--warmup', type=int, default=30, help='frames to run before timing')
+    parser.add_argument('--scenario', action='append', help='scenario to run (default: all)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for synthetic levels and input')
+    parser.add_argument('--output', help='results file (default: benchmark_results/<timestamp>.json)')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenario or scenario['name'] in args.scenario]
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': []
+    }
+
+    for scenario in scenarios:
+        entry = FrameBenchmark(scenario, args.seed).run(args.frames, args.warmup)
+        results['results'].append(entry)
+        frame = entry['phases_ms']['frame']
+        print(f"{scenario['name']:>10}: {entry['sprites']} sprites, "
+              f"frame p50 {frame['p50']:.3f} ms, p95 {frame['p95']:.3f} ms, p99 {frame['p99']:.3f} ms")
+        for phase, summary in entry['phases_ms'].items():
+            if phase == 'frame':
+                continue
+            print(f"{'':>12}{phase:<20} p50 {summary['p50']:7.3f} ms  p95 {summary['p95']:7.3f} ms")
+
+    output = args.output or os.path.join('benchmark_results', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            compare(results, json.load(previous_file))
+
+if __name__ == '__main__':
+    main()
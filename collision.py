@@ -0,0 +1,88 @@
+import pygame  # Import Pygame for game development
+from settings import *  # Import game settings
+
+class CollisionMap:
+    def __init__(self, width, height, solid=None):
+        """
+        Initialize a walkability bitmap of the map's static boundaries.
+
+        Parameters:
+        - width: Number of columns.
+        - height: Number of rows.
+        - solid: bytearray with one byte per cell in row-major order, 1 for solid cells. All cells are walkable if None.
+        """
+        self.width = width
+        self.height = height
+        self.solid = solid if solid is not None else bytearray(width * height)
+
+    @classmethod
+    def from_layer(cls, layer):
+        """Build the bitmap from a LevelLayer, treating every non-empty cell as solid."""
+        solid = bytearray(layer.width * layer.height)
+        for index in layer.sparse:
+            solid[index] = 1
+        return cls(layer.width, layer.height, solid)
+
+    def is_solid(self, col, row):
+        """Return whether a cell is solid. Cells outside the map are walkable."""
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return bool(self.solid[row * self.width + col])
+        return False
+
+    def merged_cells(self):
+        """
+        Merge the solid cells into rectangles (greedy meshing): each rectangle grows right as far as it can,
+        then down while the whole row below is solid. Every solid cell ends up in exactly one rectangle.
+        Returns a list of (col, row, columns, rows).
+        """
+        width = self.width
+        solid = self.solid
+        used = bytearray(len(solid))
+        blocks = []
+        for row in range(self.height):
+            for col in range(width):
+                index = row * width + col
+                if not solid[index] or used[index]:
+                    continue
+
+                columns = 1
+                while col + columns < width and solid[index + columns] and not used[index + columns]:
+                    columns += 1
+
+                rows = 1
+                while row + rows < self.height:
+                    start = (row + rows) * width + col
+                    if 0 in solid[start:start + columns] or 1 in used[start:start + columns]:
+                        break
+                    rows += 1
+
+                for block_row in range(row, row + rows):
+                    start = block_row * width + col
+                    used[start:start + columns] = b'\x01' * columns
+                blocks.append((col, row, columns, rows))
+        return blocks
+
+    def merged_rects(self, cell_size=TILESIZE):
+        """Return the merged rectangles of solid cells in pixels."""
+        return [pygame.Rect(col * cell_size, row * cell_size, columns * cell_size, rows * cell_size)
+                for col, row, columns, rows in self.merged_cells()]
+
+class Boundary(pygame.sprite.Sprite):
+    snapshot_fields = ('rect', 'hitbox')  # Attributes restored by LevelSnapshot
+
+    def __init__(self, rect, groups):
+        """
+        Initialize an invisible obstacle covering a merged rectangle of boundary cells.
+
+        The hitbox is inset at the top and bottom like a single boundary tile's, so a stack of cells
+        blocks movement the same way its separate tiles did.
+
+        Parameters:
+        - rect: Rectangle of the merged cells in pixels.
+        - groups: Groups the sprite belongs to.
+        """
+        super().__init__()
+        self.sprite_type = 'invisible'
+        self.rect = rect
+        self.hitbox = rect.inflate(0, HITBOX_OFFSET['invisible'])
+        self.add(groups)  # Join the groups last so indexed groups can read the hitbox
@@ -0,0 +1,103 @@
+import pygame  # Import Pygame for game development
+
+MENU_TOGGLE = 'menu'  # Pseudo key that toggles the upgrade menu in scripts and recordings
+
+class KeyState:
+    def __init__(self, pressed=()):
+        """
+        Initialize a key state that can be indexed like pygame.key.get_pressed().
+
+        Parameters:
+        - pressed: Collection of pygame key constants that are held down.
+        """
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class InputSource:
+    def __init__(self):
+        """
+        Initialize the state shared by every input source.
+        The level polls its input source once per tick, so a tick always sees one consistent key state.
+        """
+        self.keys = KeyState()
+        self.menu_toggled = False  # Whether the upgrade menu is toggled on this tick
+        self.menu_toggle_requested = False  # Toggle asked for by a key event since the last poll
+
+    def request_menu_toggle(self):
+        """Toggle the upgrade menu on the next tick."""
+        self.menu_toggle_requested = True
+
+    def poll(self):
+        """Sample the input for the next tick."""
+        self.keys, menu_toggled = self.next_tick()
+        self.menu_toggled = menu_toggled or self.menu_toggle_requested
+        self.menu_toggle_requested = False
+
+    def next_tick(self):
+        """Return the key state and menu toggle of the next tick."""
+        raise NotImplementedError
+
+    def get_pressed(self):
+        """Return the key state sampled by the last poll."""
+        return self.keys
+
+class KeyboardInput(InputSource):
+    def next_tick(self):
+        """Sample the live keyboard."""
+        return pygame.key.get_pressed(), False
+
+class ScriptedInput(InputSource):
+    def __init__(self, script):
+        """
+        Initialize an input source that replays a script of key states.
+
+        Parameters:
+        - script: Iterable yielding, for each tick, a collection of pygame key constants that are held down.
+          Include MENU_TOGGLE to toggle the upgrade menu. No keys are held once the script runs out.
+        """
+        super().__init__()
+        self.script = iter(script)
+        self.finished = False
+
+    @classmethod
+    def from_lines(cls, lines):
+        """
+        Build a scripted input from lines of the form '<keys> <ticks>'.
+
+        Keys are pygame key names joined with '+', e.g. 'd 120', 'w+space 10', '- 30' for no keys.
+        The name 'menu' toggles the upgrade menu. Blank lines and lines starting with '#' are ignored.
+        """
+        def ticks():
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                names, count = line.split()
+                pressed = [] if names == '-' else [key_from_name(name) for name in names.split('+')]
+                for _ in range(int(count)):
+                    yield pressed
+        return cls(ticks())
+
+    def next_tick(self):
+        """Advance the script by one tick."""
+        pressed = next(self.script, None)
+        if pressed is None:
+            self.finished = True
+            pressed = ()
+        keys = KeyState(pressed)
+        return keys, keys[MENU_TOGGLE]
+
+def key_from_name(name):
+    """
+    Return the pygame key constant for a name such as 'w', 'space' or 'lctrl', or MENU_TOGGLE for 'menu'.
+    """
+    if name == MENU_TOGGLE:
+        return MENU_TOGGLE
+    key = getattr(pygame, f'K_{name}', None)
+    if key is None:
+        key = getattr(pygame, f'K_{name.upper()}', None)
+    if key is None:
+        raise ValueError(f"Unknown key name: {name}")
+    return key
@@ -1,11 +1,17 @@
 import pygame
+from math import hypot  # Import hypot for distance calculations
 from entity import Entity  # Import the Entity base class
-from support import import_folder  # Import the function to import graphics from a folder
+from assets import asset_cache  # Import the shared asset cache
+from audio import audio_manager  # Import the shared audio manager
+from profiler import profiler  # Import the frame profiler
 from settings import *  # Import game settings
 
 class Enemy(Entity):
-    def __init__(self, monster_name, pos, groups, obstacle_sprites, damage_player, trigger_death_particles, add_gold):
-        super().__init__(groups)
+    # Attributes that change during play, restored by LevelSnapshot
+    snapshot_fields = Entity.snapshot_fields + ('health', 'can_attack', 'attack_time', 'vulnerable', 'hit_time')
+
+    def __init__(self, monster_name, pos, groups, obstacle_sprites, damage_player, trigger_death_particles, add_gold, clock, monster_table=monster_data):
+        super().__init__((), clock)
         self.sprite_type = 'enemy'
 
         # Graphics setup
@@ -20,7 +26,7 @@ class Enemy(Entity):
 
         # Stats setup
         self.monster_name = monster_name
-        monster_info = monster_data[self.monster_name]
+        monster_info = monster_table[self.monster_name]  # The level's monster_data, with any balance overrides
         self.health = monster_info['health']
         self.gold = monster_info['gold']
         self.speed = monster_info['speed']
@@ -43,13 +49,11 @@ class Enemy(Entity):
         self.hit_time = None
         self.invincibility_duration = 300
 
-        # Sounds setup
-        self.death_sound = pygame.mixer.Sound('audio/attack/death.wav')
-        self.hit_sound = pygame.mixer.Sound('audio/attack/Hit.wav')
-        self.attack_sound = pygame.mixer.Sound(monster_info['attack_sound'])
-        self.death_sound.set_volume(0.02)
-        self.hit_sound.set_volume(0.02)
-        self.attack_sound.set_volume(0.02)
+        # Sounds setup: names of shared sounds played through the audio manager
+        self.attack_sound = monster_info['attack_sound']
+
+        # Join the groups last, once the hitbox the enemy group sorts by exists
+        self.add(groups)
 
     def import_graphics(self, name):
         # Load enemy animations
@@ -57,7 +61,7 @@ class Enemy(Entity):
         main_path = f'graphics/enemies/{name}/'
         for animation in self.animations.keys():
             full_path = main_path + animation
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = asset_cache.folder(full_path)
 
         # Ensure there are animation frames for the current status
         if not self.animations[self.status]:
@@ -78,10 +82,8 @@ class Enemy(Entity):
 
         return (distance, direction)
 
-    def get_status(self, player):
+    def get_status(self, distance):
         # Determine the enemy's status based on distance to the player
-        distance = self.get_player_distance_direction(player)[0]
-
         if distance <= self.attack_radius and self.can_attack:
             if self.status != 'attack':
                 self.frame_index = 0
@@ -91,16 +93,19 @@ class Enemy(Entity):
         else:
             self.status = 'idle'
 
-    def actions(self, player):
-        # Define enemy actions based on status
+    def actions(self, distance, dx, dy, steering=None):
+        # Define enemy actions based on status; dx, dy is the offset to the player
+        # and steering the direction to move in instead of straight at the player (flow field and separation)
         if self.status == 'attack':
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = self.clock.get_ticks()
             self.damage_player(self.attack_damage, self.attack_type)
-            self.attack_sound.play()
-        elif self.status == 'move':
-            self.direction = self.get_player_distance_direction(player)[1]
+            audio_manager.play(self.attack_sound, self.rect.center)
+        elif self.status == 'move' and steering is not None:
+            self.direction.update(steering)  # Follow the path around obstacles and crowds; move() normalizes it
+        elif self.status == 'move' and distance > 0:
+            self.direction.update(dx / distance, dy / distance)  # Update in place instead of allocating
         else:
-            self.direction = pygame.math.Vector2()
+            self.direction.update(0, 0)
 
     def animate(self):
         # Handle enemy animation
@@ -111,18 +116,15 @@ class Enemy(Entity):
                 self.can_attack = False
             self.frame_index = 0
 
+        # Flicker effect when not vulnerable: the camera skips hidden entities
+        self.hidden = not self.vulnerable and not self.wave_value()
+
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(center=self.hitbox.center)
 
-        if not self.vulnerable:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-
     def cooldowns(self):
         # Handle attack and invincibility cooldowns
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if not self.can_attack:
             if current_time - self.attack_time >= self.attack_cooldown:
                 self.can_attack = True
@@ -134,13 +136,13 @@ class Enemy(Entity):
     def get_damage(self, player, attack_type):
         # Handle damage taken by the enemy
         if self.vulnerable:
-            self.hit_sound.play()
+            audio_manager.play('hit', self.rect.center)
             self.direction = self.get_player_distance_direction(player)[1]
             if attack_type == 'weapon':
                 self.health -= player.get_full_weapon_damage()
             else:
                 self.health -= player.get_full_magic_damage()
-            self.hit_time = pygame.time.get_ticks()
+            self.hit_time = self.clock.get_ticks()
             self.vulnerable = False
 
     def check_death(self):
@@ -149,7 +151,7 @@ class Enemy(Entity):
             self.kill()
             self.trigger_death_particles(self.rect.center, self.monster_name)
             self.add_gold(self.gold)
-            self.death_sound.play()
+            audio_manager.play('death', self.rect.center)
 
     def hit_reaction(self):
         # Handle enemy's reaction to being hit
@@ -164,7 +166,142 @@ class Enemy(Entity):
         self.cooldowns()
         self.check_death()
 
-    def enemy_update(self, player):
-        # Update enemy's status and actions based on the player's position
-        self.get_status(player)
-        self.actions(player)
+    def enemy_update(self, distance, dx, dy, steering=None):
+        # Update enemy's status and actions based on the offset to the player
+        self.get_status(distance)
+        self.actions(distance, dx, dy, steering)
+
+class EnemyGroup(pygame.sprite.Group):
+    def __init__(self, *sprites, monster_table=monster_data):
+        """
+        Initialize a group of enemies filed into map sectors.
+
+        Only enemies in sectors within the activation radius of the player are awake. The radius covers
+        the screen and every monster's notice radius in monster_table, the level's monster_data.
+        Sleeping enemies are not updated at all; their timers read the simulation clock,
+        so they resume where they left off when the player comes back.
+        """
+        self.sectors = {}  # (col, row) -> enemies whose hitbox center is in the sector
+        self.enemy_sectors = {}  # Enemy -> its sector
+        self.creation_order = {}  # Enemy -> order it joined the group, so enemies always update in that order
+        self.created = 0
+        self.awake = {}  # Enemies near the player, in creation order
+        self.activation_radius = max(WIDTH // 2, HEIGHT // 2, *(info['notice_radius'] for info in monster_table.values())) + ENEMY_ACTIVATION_MARGIN
+        super().__init__(*sprites)
+
+    def sector_of(self, enemy):
+        """Return the sector containing the enemy's hitbox center."""
+        center_x, center_y = enemy.hitbox.center
+        return center_x // ENEMY_SECTOR_SIZE, center_y // ENEMY_SECTOR_SIZE
+
+    def add_internal(self, sprite, layer=None):
+        """Add an enemy to the group and file it into its sector."""
+        super().add_internal(sprite, layer)
+        sector = self.sector_of(sprite)
+        self.sectors.setdefault(sector, {})[sprite] = None
+        self.enemy_sectors[sprite] = sector
+        self.creation_order[sprite] = self.created
+        self.created += 1
+
+    def remove_internal(self, sprite):
+        """Remove an enemy from the group and from its sector."""
+        super().remove_internal(sprite)
+        sector = self.enemy_sectors.pop(sprite)
+        del self.sectors[sector][sprite]
+        if not self.sectors[sector]:
+            del self.sectors[sector]
+        del self.creation_order[sprite]
+        self.awake.pop(sprite, None)
+
+    def wake(self, player):
+        """
+        Wake the enemies in sectors near the player and put every other enemy to sleep.
+        """
+        player_x, player_y = player.rect.center
+        radius = self.activation_radius
+        first_col = (player_x - radius) // ENEMY_SECTOR_SIZE
+        last_col = (player_x + radius) // ENEMY_SECTOR_SIZE
+        first_row = (player_y - radius) // ENEMY_SECTOR_SIZE
+        last_row = (player_y + radius) // ENEMY_SECTOR_SIZE
+
+        awake = []
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                sector = self.sectors.get((col, row))
+                if sector:
+                    awake.extend(sector)
+        awake.sort(key=self.creation_order.__getitem__)
+        self.awake = dict.fromkeys(awake)
+        profiler.count('enemies_awake', len(awake))
+
+    def update(self, *args, **kwargs):
+        """
+        Update the awake enemies, then move the ones that crossed into another sector.
+        """
+        awake = list(self.awake)
+        for enemy in awake:
+            enemy.update(*args, **kwargs)
+
+        for enemy in awake:
+            old_sector = self.enemy_sectors.get(enemy)
+            if old_sector is None:
+                continue  # The enemy died during its update
+            sector = self.sector_of(enemy)
+            if sector != old_sector:
+                del self.sectors[old_sector][enemy]
+                if not self.sectors[old_sector]:
+                    del self.sectors[old_sector]
+                self.sectors.setdefault(sector, {})[enemy] = None
+                self.enemy_sectors[enemy] = sector
+
+    def separation(self, enemy, neighbours):
+        """
+        Return the (x, y) push away from the other enemies within ENEMY_SEPARATION_RADIUS of an enemy,
+        each pushing harder the closer it is.
+        """
+        radius = ENEMY_SEPARATION_RADIUS
+        enemy_x, enemy_y = enemy.hitbox.center
+        area = pygame.Rect(enemy_x - radius, enemy_y - radius, radius * 2, radius * 2)
+        push_x = push_y = 0.0
+        for other in neighbours.query(area):
+            if other is enemy or other.sprite_type != 'enemy':
+                continue
+            dx = enemy_x - other.hitbox.centerx
+            dy = enemy_y - other.hitbox.centery
+            distance = hypot(dx, dy)
+            if 0 < distance < radius:
+                weight = (radius - distance) / (radius * distance)
+                push_x += dx * weight
+                push_y += dy * weight
+        return push_x, push_y
+
+    def enemy_update(self, player, flow_field=None, neighbours=None):
+        """
+        Update the status and actions of the awake enemies in a single pass.
+        Enemies join this group when they are created and leave it when they die,
+        so there is no per-frame search for them.
+
+        Parameters:
+        - player: The player the enemies chase.
+        - flow_field: FlowField leading to the player, shared by every enemy that notices them. Enemies head
+          straight for the player if None.
+        - neighbours: DynamicGroup indexing the enemies, used to steer enemies apart so they do not stack.
+        """
+        player_x, player_y = player.rect.center
+        for enemy in list(self.awake):
+            enemy_x, enemy_y = enemy.rect.center
+            dx = player_x - enemy_x
+            dy = player_y - enemy_y
+            distance = hypot(dx, dy)
+            steering = None
+            if distance <= enemy.notice_radius:
+                if flow_field is not None:
+                    steering = flow_field.direction(enemy.hitbox.center)
+                if neighbours is not None and ENEMY_SEPARATION_WEIGHT:
+                    push_x, push_y = self.separation(enemy, neighbours)
+                    if push_x or push_y:
+                        chase_x, chase_y = steering if steering is not None else (dx, dy)
+                        length = hypot(chase_x, chase_y) or 1
+                        steering = (chase_x / length + push_x * ENEMY_SEPARATION_WEIGHT,
+                                    chase_y / length + push_y * ENEMY_SEPARATION_WEIGHT)
+            enemy.enemy_update(distance, dx, dy, steering)
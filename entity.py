@@ -1,20 +1,31 @@
 import pygame
 from math import sin  # Import the sin function from the math module
+from profiler import profiler  # Import the frame profiler
 
 class Entity(pygame.sprite.Sprite):
-    def __init__(self, groups):
+    # Attributes that change during play, restored by LevelSnapshot
+    snapshot_fields = ('rect', 'hitbox', 'image', 'direction', 'frame_index', 'status', 'previous_center', 'previous_tick', 'hidden')
+
+    def __init__(self, groups, clock):
         super().__init__(groups)
+        self.clock = clock  # Simulation clock used for cooldowns and effects
         self.frame_index = 0
         self.animation_speed = 0.1  # Adjusted speed for slower animation
         self.direction = pygame.math.Vector2()  # Initialize direction as a vector
+        self.previous_center = None  # Hitbox center before the last move, for interpolated drawing
+        self.previous_tick = None  # Tick of the last move; older moves are not interpolated
+        self.hidden = False  # Skipped when drawing, for the flicker effect while invulnerable
 
     def move(self, speed):
         """
         Move the entity in the direction vector at the given speed.
         Handles both horizontal and vertical movement and checks for collisions.
         """
+        self.previous_center = self.hitbox.center
+        self.previous_tick = self.clock.tick_count
+
         if self.direction.magnitude() != 0:
-            self.direction = self.direction.normalize()
+            self.direction.normalize_ip()
 
         # Move horizontally and check for collisions
         self.hitbox.x += self.direction.x * speed
@@ -31,9 +42,13 @@ class Entity(pygame.sprite.Sprite):
         """
         Check and resolve collisions in the given direction (horizontal or vertical).
         Adjust the hitbox position to prevent overlapping with obstacle sprites.
+        Only obstacles in the grid cells covered by the hitbox are checked.
         """
+        obstacles = self.obstacle_sprites.query(self.hitbox)
+        profiler.count('collision_checks', len(obstacles))
+
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.x > 0:  # Moving right
                         self.hitbox.right = sprite.hitbox.left
@@ -41,20 +56,35 @@ class Entity(pygame.sprite.Sprite):
                         self.hitbox.left = sprite.hitbox.right
 
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
+            for sprite in obstacles:
                 if sprite.hitbox.colliderect(self.hitbox):
                     if self.direction.y > 0:  # Moving down
                         self.hitbox.bottom = sprite.hitbox.top
                     if self.direction.y < 0:  # Moving up
                         self.hitbox.top = sprite.hitbox.bottom
 
+    def interpolation_offset(self, alpha):
+        """
+        Return how far back (x, y) to draw the entity, blending its position before and after the last tick.
+
+        Parameters:
+        - alpha: Fraction of a tick elapsed since the last update, from 0 to 1.
+
+        Entities that did not move on the last tick (e.g. while the game is paused) are drawn where they are.
+        """
+        if self.previous_center is None or self.previous_tick != self.clock.tick_count - 1:
+            return 0, 0
+        current_x, current_y = self.hitbox.center
+        previous_x, previous_y = self.previous_center
+        return (previous_x - current_x) * (1 - alpha), (previous_y - current_y) * (1 - alpha)
+
     def wave_value(self):
         """
-        Calculate a wave value based on the current time.
+        Calculate a wave value based on the current simulation time.
         Returns 255 if the value is non-negative, otherwise returns 0.
         This can be used for creating a wave-like animation effect.
         """
-        value = sin(pygame.time.get_ticks())
+        value = sin(self.clock.get_ticks())
         if value >= 0:
             return 255
         else:
@@ -0,0 +1,329 @@
+"""
+Gym-style environments for automated playthroughs.
+An AdventureEnv wraps one headless level: actions are key masks (the same encoding as recordings) and
+observations are flat vectors of player stats, the nearest enemies and the keys and doors left.
+A VectorEnv steps many environments at once, sharded across worker processes that exchange actions,
+observations, rewards and done flags through one shared memory block.
+
+Usage:
+    python env.py [--envs N] [--workers W] [--steps S]    Run random playthroughs and print the throughput
+"""
+
+import pygame, os, time, random, argparse
+import multiprocessing
+from multiprocessing import shared_memory
+from array import array  # Import array for observation vectors
+from settings import *  # Import game settings
+from controls import InputSource  # Import the input source base class
+from replay import RECORDED_KEYS, decode_keys  # Import the key mask encoding
+from headless import init_headless  # Import the headless setup
+from level import Level  # Import the Level class
+
+# Bits of an action mask, in the order of RECORDED_KEYS
+ACTION_BITS = {key if isinstance(key, str) else pygame.key.name(key): 1 << bit for bit, key in enumerate(RECORDED_KEYS)}
+
+MONSTER_IDS = {name: number for number, name in enumerate(monster_data, 1)}  # Enemy type in observations; 0 is an empty slot
+OBJECTIVE_IDS = {'keys': 1, 'key1': 2, 'door': 3}  # Objective type in observations
+
+# Names of the observation values, in vector order
+OBSERVATION_FIELDS = (
+    ['tick', 'x', 'y', 'health', 'energy', 'gold', 'keys', 'vulnerable', 'magic_index'] +
+    [f'stat_{name}' for name in ('health', 'energy', 'attack', 'magic', 'speed')] +
+    [f'enemy{slot}_{name}' for slot in range(ENV_ENEMY_SLOTS) for name in ('dx', 'dy', 'health', 'type')] +
+    [f'objective{slot}_{name}' for slot in range(ENV_OBJECTIVE_SLOTS) for name in ('dx', 'dy', 'type', 'present')]
+)
+OBSERVATION_SIZE = len(OBSERVATION_FIELDS)
+
+class ActionInput(InputSource):
+    def __init__(self):
+        """
+        Initialize an input source that holds the keys of the current action until the next one is set.
+        """
+        super().__init__()
+        self.action = 0
+
+    def next_tick(self):
+        """Return the key state of the current action mask."""
+        return decode_keys(self.action)
+
+class AdventureEnv:
+    def __init__(self, seed=None, balance=None, action_repeat=1, max_ticks=ENV_MAX_TICKS):
+        """
+        Initialize an environment around a headless level.
+
+        Parameters:
+        - seed: Seed of the first episode; later episodes draw their seeds from it. Random if None.
+        - balance: Overrides of monster_data, magic_data and the player's upgrade_cost for this environment's level,
+          e.g. {'upgrade_cost': {'attack': 50}}. See Level.
+        - action_repeat: Simulation ticks each step holds its action for.
+        - max_ticks: Ticks after which an episode is cut off (reported as truncated).
+        """
+        if not pygame.get_init():
+            init_headless()
+
+        self.seeds = random.Random(seed)
+        self.action_repeat = action_repeat
+        self.max_ticks = max_ticks
+        self.input_source = ActionInput()
+        self.level = Level(headless=True, input_source=self.input_source, seed=self.seeds.randrange(2 ** 32), balance=balance)
+
+        # Keys and doors, in map order; killed ones are restored with the level
+        self.objectives = [sprite for sprite in self.level.attackable_sprites
+                           if sprite.sprite_type in OBJECTIVE_IDS][:ENV_OBJECTIVE_SLOTS]
+        self.last_gold = 0
+
+    def reset(self, seed=None):
+        """
+        Start a new episode and return its first observation.
+
+        Parameters:
+        - seed: Seed of the level's random number generator, or None for the next seed of the environment.
+        """
+        self.level.seed = seed if seed is not None else self.seeds.randrange(2 ** 32)
+        self.level.reset_level()
+        self.input_source.action = 0
+        self.last_gold = self.level.player.gold
+        return self.observe()
+
+    def step(self, action):
+        """
+        Hold the keys of an action mask for action_repeat ticks.
+        Returns the observation, the reward (gold earned), whether the episode is done, and an info dictionary.
+        Call reset once an episode is done.
+        """
+        level = self.level
+        player = level.player
+        self.input_source.action = action
+        for _ in range(self.action_repeat):
+            level.update()
+            if level.game_over or player.health <= 0:
+                break
+
+        won = level.game_over
+        died = player.health <= 0
+        truncated = level.clock.tick_count >= self.max_ticks
+        reward = player.gold - self.last_gold
+        self.last_gold = player.gold
+
+        info = {
+            'won': won,
+            'died': died,
+            'truncated': truncated,
+            'ticks': level.clock.tick_count,
+            'gold': player.gold,
+            'keys': player.keys,
+            'enemies_left': len(level.enemy_sprites)
+        }
+        return self.observe(), reward, won or died or truncated, info
+
+    def observe(self):
+        """Return the observation vector, laid out as OBSERVATION_FIELDS."""
+        level = self.level
+        player = level.player
+        player_x, player_y = player.rect.center
+        stats = player.stats
+
+        observation = array('d', (
+            level.clock.tick_count, player_x, player_y, player.health, player.energy, player.gold, player.keys,
+            player.vulnerable, player.magic_index,
+            stats['health'], stats['energy'], stats['attack'], stats['magic'], stats['speed']))
+
+        # Nearest enemies in view, closest first; empty slots are zeros
+        enemies = []
+        for enemy in level.enemy_sprites:
+            dx = enemy.rect.centerx - player_x
+            dy = enemy.rect.centery - player_y
+            distance = dx * dx + dy * dy
+            if distance <= ENV_VIEW_RADIUS * ENV_VIEW_RADIUS:
+                enemies.append((distance, dx, dy, enemy))
+        enemies.sort(key=lambda item: item[0])
+        for distance, dx, dy, enemy in enemies[:ENV_ENEMY_SLOTS]:
+            observation.extend((dx, dy, enemy.health, MONSTER_IDS[enemy.monster_name]))
+        observation.extend([0.0] * (4 * max(ENV_ENEMY_SLOTS - len(enemies), 0)))
+
+        for objective in self.objectives:
+            observation.extend((objective.rect.centerx - player_x, objective.rect.centery - player_y,
+                                OBJECTIVE_IDS[objective.sprite_type], objective.alive()))
+        observation.extend([0.0] * (4 * (ENV_OBJECTIVE_SLOTS - len(self.objectives))))
+        return observation
+
+def buffer_layout(num_envs):
+    """
+    Return the layout of a VectorEnv's shared memory as a list of (name, typecode, offset, length),
+    with every array aligned to 8 bytes.
+    """
+    layout = []
+    offset = 0
+    for name, typecode, length in (('actions', 'H', num_envs), ('observations', 'd', num_envs * OBSERVATION_SIZE),
+                                   ('rewards', 'd', num_envs), ('dones', 'B', num_envs)):
+        offset += -offset % 8
+        layout.append((name, typecode, offset, length))
+        offset += length * array(typecode).itemsize
+    return layout
+
+def buffer_size(num_envs):
+    """Return the number of bytes of a VectorEnv's shared memory."""
+    name, typecode, offset, length = buffer_layout(num_envs)[-1]
+    return offset + length * array(typecode).itemsize
+
+def buffer_views(buffer, num_envs):
+    """
+    Split a shared memory buffer into the action, observation, reward and done arrays of a VectorEnv.
+    Returns a dictionary of name -> memoryview.
+    """
+    return {name: buffer[offset:offset + length * array(typecode).itemsize].cast(typecode)
+            for name, typecode, offset, length in buffer_layout(num_envs)}
+
+def run_worker(connection, memory_name, num_envs, shard, seed, balance, action_repeat, max_ticks):
+    """
+    Host the environments of one shard in a worker process, stepping them on command.
+    Finished episodes are reset right away, and their final info is sent back.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    views = buffer_views(memory.buf, num_envs)
+    actions, observations, rewards, dones = views['actions'], views['observations'], views['rewards'], views['dones']
+    envs = {index: AdventureEnv(seed + index if seed is not None else None, balance, action_repeat, max_ticks)
+            for index in shard}
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == 'reset':
+                for index, env in envs.items():
+                    observation = env.reset(data + index if data is not None else None)
+                    observations[index * OBSERVATION_SIZE:(index + 1) * OBSERVATION_SIZE] = observation
+                    rewards[index] = 0.0
+                    dones[index] = False
+                connection.send(None)
+            elif command == 'step':
+                infos = {}
+                for index, env in envs.items():
+                    observation, reward, done, info = env.step(actions[index])
+                    if done:
+                        infos[index] = info
+                        observation = env.reset()
+                    observations[index * OBSERVATION_SIZE:(index + 1) * OBSERVATION_SIZE] = observation
+                    rewards[index] = reward
+                    dones[index] = done
+                connection.send(infos)
+            elif command == 'close':
+                break
+    finally:
+        for view in views.values():
+            view.release()
+        memory.close()
+
+class VectorEnv:
+    def __init__(self, num_envs, workers=None, seed=None, balance=None, action_repeat=1, max_ticks=ENV_MAX_TICKS):
+        """
+        Initialize a batch of environments sharded across worker processes.
+
+        Actions are written to, and observations, rewards and done flags read from, one shared memory block,
+        so a step only sends a short command to each worker.
+
+        Parameters:
+        - num_envs: Number of environments.
+        - workers: Number of worker processes. Defaults to one per CPU core.
+        - seed: Seed of environment 0; environment i uses seed + i. Random if None.
+        - balance, action_repeat, max_ticks: Passed to every AdventureEnv.
+        """
+        self.num_envs = num_envs
+        workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+
+        self.memory = shared_memory.SharedMemory(create=True, size=buffer_size(num_envs))
+        views = buffer_views(self.memory.buf, num_envs)
+        self.actions = views['actions']  # Key mask of each environment, written before a step
+        self.observations = views['observations']  # Environment i's observation is [i * OBSERVATION_SIZE:(i + 1) * OBSERVATION_SIZE]
+        self.rewards = views['rewards']
+        self.dones = views['dones']
+
+        # Contiguous shards of environments, one per worker
+        self.connections = []
+        self.processes = []
+        for worker in range(workers):
+            shard = range(num_envs * worker // workers, num_envs * (worker + 1) // workers)
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker, daemon=True,
+                args=(worker_connection, self.memory.name, num_envs, shard, seed, balance, action_repeat, max_ticks))
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def observation(self, index):
+        """Return the observation of one environment as a view into shared memory."""
+        return self.observations[index * OBSERVATION_SIZE:(index + 1) * OBSERVATION_SIZE]
+
+    def reset(self, seed=None):
+        """
+        Start a new episode in every environment. Environment i uses seed + i if a seed is given.
+        Returns the shared observations.
+        """
+        for connection in self.connections:
+            connection.send(('reset', seed))
+        for connection in self.connections:
+            connection.recv()
+        return self.observations
+
+    def step(self, actions):
+        """
+        Step every environment with its action mask.
+        Environments whose episode ended are reset, so their observation is the first of the next episode.
+        Returns the shared observations, rewards and done flags, and a dictionary of
+        environment index -> final info of each episode that ended on this step.
+        """
+        self.actions[:] = array('H', actions)
+        for connection in self.connections:
+            connection.send(('step', None))
+        infos = {}
+        for connection in self.connections:
+            infos.update(connection.recv())
+        return self.observations, self.rewards, self.dones, infos
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        for connection in self.connections:
+            connection.send(('close', None))
+        for process in self.processes:
+            process.join()
+        for view in (self.actions, self.observations, self.rewards, self.dones):
+            view.release()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def random_actions(rng, count):
+    """Return random action masks that move, attack and cast."""
+    moves = [0, ACTION_BITS['w'], ACTION_BITS['a'], ACTION_BITS['s'], ACTION_BITS['d']]
+    return [rng.choice(moves) | (ACTION_BITS['space'] if rng.random() < 0.2 else 0) |
+            (ACTION_BITS['left ctrl'] if rng.random() < 0.05 else 0) for _ in range(count)]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run random playthroughs on a vectorized environment.')
+    parser.add_argument('--envs', type=int, default=8, help='number of environments')
+    parser.add_argument('--workers', type=int, help='number of worker processes (default: one per core)')
+    parser.add_argument('--steps', type=int, default=1000, help='steps to run')
+    parser.add_argument('--repeat', type=int, default=4, help='ticks each action is held for')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the levels and the random actions')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with VectorEnv(args.envs, args.workers, args.seed, action_repeat=args.repeat) as envs:
+        envs.reset(args.seed)
+        episodes = []
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            observations, rewards, dones, infos = envs.step(random_actions(rng, args.envs))
+            episodes.extend(infos.values())
+        elapsed = time.perf_counter() - start
+
+    ticks = args.envs * args.steps * args.repeat
+    print(f"{args.envs} environments on {len(envs.processes)} workers: {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if episodes:
+        print(f"{len(episodes)} episodes ended: {sum(info['won'] for info in episodes)} won, "
+              f"{sum(info['died'] for info in episodes)} died, {sum(info['truncated'] for info in episodes)} cut off, "
+              f"{sum(info['gold'] for info in episodes) / len(episodes):.0f} gold on average")
@@ -0,0 +1,143 @@
+import pygame  # Import Pygame for game development
+import os  # Import OS module for interacting with the operating system
+from collections import OrderedDict  # Import OrderedDict to track least recently used chunks
+from settings import *  # Import game settings
+from support import convert_image, tileset_tile  # Import the image helpers
+from level_data import load_level, source_hash  # Import the compiled level loader
+
+class ChunkedFloor:
+    def __init__(self, png_path, chunk_size=FLOOR_CHUNK_SIZE, memory_budget=FLOOR_CHUNK_BUDGET, layer_paths=None):
+        """
+        Initialize a floor that is drawn from fixed-size chunks of a large image.
+
+        The first time an image is used it is split into chunk files in the cache directory,
+        with any flat tile layers baked on top, so they cost nothing per frame.
+        After that, chunks are loaded lazily when they come on screen, and the least recently
+        used chunks are evicted once the resident chunks exceed the memory budget.
+
+        Parameters:
+        - png_path: Path to the floor image.
+        - chunk_size: Width and height of each chunk in pixels.
+        - memory_budget: Maximum number of bytes of resident chunk surfaces.
+        - layer_paths: Dictionary of layer name to CSV path of tile layers drawn over the image, bottom first.
+        """
+        self.png_path = png_path
+        self.layer_paths = layer_paths or {}
+        self.chunk_size = chunk_size
+        self.max_chunks = max(1, memory_budget // (chunk_size * chunk_size * 4))  # Chunks are 32-bit surfaces
+        self.chunks = OrderedDict()  # (col, row) -> Surface, oldest first
+        self.source_chunks = None  # All chunks kept in memory when the cache cannot be written
+
+        # The cache is keyed by the source files so edits to the image or the layers rebuild it
+        stat = os.stat(png_path)
+        name = os.path.splitext(os.path.basename(png_path))[0]
+        if self.layer_paths:
+            name += '-' + source_hash(self.layer_paths)[:12]
+        self.cache_dir = os.path.join(CACHE_DIR, 'floor', f'{name}-{stat.st_size}-{stat.st_mtime_ns}-{chunk_size}')
+        self.size = self.prepare_chunks()
+        self.cols = -(-self.size[0] // chunk_size)
+        self.rows = -(-self.size[1] // chunk_size)
+
+    def chunk_path(self, col, row):
+        """Return the cache file path of a chunk."""
+        return os.path.join(self.cache_dir, f'{col}_{row}.png')
+
+    def prepare_chunks(self):
+        """
+        Make sure the chunk files exist and return the size of the full floor.
+        Bakes the tile layers into the source image and splits it into chunk files if the cache is missing.
+        """
+        index_path = os.path.join(self.cache_dir, 'index.txt')
+        if os.path.exists(index_path):
+            with open(index_path) as index_file:
+                width, height = (int(value) for value in index_file.read().split(','))
+            return width, height
+
+        # Splitting works on the decoded image as is, so this can run off the main thread
+        floor_surf = pygame.image.load(self.png_path)
+        self.bake_layers(floor_surf)
+        width, height = floor_surf.get_size()
+        size = self.chunk_size
+        chunks = {}
+        for row in range(-(-height // size)):
+            for col in range(-(-width // size)):
+                area = pygame.Rect(col * size, row * size, size, size).clip(floor_surf.get_rect())
+                chunks[(col, row)] = floor_surf.subsurface(area).copy()
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for (col, row), chunk in chunks.items():
+                pygame.image.save(chunk, self.chunk_path(col, row))
+            # The index is written last so an interrupted build is redone next time
+            with open(index_path, 'w') as index_file:
+                index_file.write(f'{width},{height}')
+        except (OSError, pygame.error):
+            # Without a writable cache every chunk stays in memory
+            self.source_chunks = chunks
+        return width, height
+
+    def bake_layers(self, floor_surf):
+        """Draw the tile layers onto the floor image in order."""
+        if not self.layer_paths:
+            return
+        tileset = pygame.image.load(TILESET_PATH)
+        tiles = {}  # Tile id -> image, shared by every cell using it
+        for layer in load_level(self.layer_paths).values():
+            for row, col, value in layer.items():
+                image = tiles.get(value)
+                if image is None:
+                    image = tiles[value] = tileset_tile(tileset, value)
+                floor_surf.blit(image, (col * TILESIZE, row * TILESIZE))
+
+    def get_chunk(self, col, row):
+        """Return a chunk surface, loading it from the cache if it is not resident."""
+        key = (col, row)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        if self.source_chunks is not None:
+            chunk = convert_image(self.source_chunks[key], alpha=False)
+        else:
+            chunk = pygame.image.load(self.chunk_path(col, row)).convert()
+        self.chunks[key] = chunk
+        return chunk
+
+    def read(self, rect):
+        """Return a new surface with the floor pixels inside a world-space rect."""
+        size = self.chunk_size
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        for row in range(max(rect.top // size, 0), min((rect.bottom - 1) // size, self.rows - 1) + 1):
+            for col in range(max(rect.left // size, 0), min((rect.right - 1) // size, self.cols - 1) + 1):
+                surface.blit(self.get_chunk(col, row), (col * size - rect.left, row * size - rect.top))
+        self.evict()
+        return surface
+
+    def evict(self):
+        """Drop the least recently used chunks until the memory budget is met."""
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+
+    def draw(self, surface, offset):
+        """
+        Blit the chunks that overlap the viewport.
+
+        Parameters:
+        - surface: Surface to draw onto.
+        - offset: World position of the top-left corner of the viewport.
+        """
+        size = self.chunk_size
+        width, height = surface.get_size()
+        left, top = int(offset[0]), int(offset[1])
+
+        first_col = max(left // size, 0)
+        first_row = max(top // size, 0)
+        last_col = min((left + width - 1) // size, self.cols - 1)
+        last_row = min((top + height - 1) // size, self.rows - 1)
+
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                surface.blit(self.get_chunk(col, row), (col * size - left, row * size - top))
+
+        self.evict()
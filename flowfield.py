@@ -0,0 +1,192 @@
+from array import array  # Import array for the per-cell distance table
+from heapq import heappush, heappop  # Import the heap operations for Dijkstra's algorithm
+from settings import *  # Import game settings
+
+UNREACHED = -1  # Distance of cells the field has not reached
+STRAIGHT_COST = 10  # Cost of a step to a side neighbour
+DIAGONAL_COST = 14  # Cost of a diagonal step, about 10 * sqrt(2)
+
+# Neighbour offsets (col, row, cost); diagonals may not cut past a blocked corner
+NEIGHBOURS = [(1, 0, STRAIGHT_COST), (-1, 0, STRAIGHT_COST), (0, 1, STRAIGHT_COST), (0, -1, STRAIGHT_COST),
+              (1, 1, DIAGONAL_COST), (-1, -1, DIAGONAL_COST), (1, -1, DIAGONAL_COST), (-1, 1, DIAGONAL_COST)]
+OPPOSITE = [NEIGHBOURS.index((-col, -row, cost)) for col, row, cost in NEIGHBOURS]
+
+class FlowField:
+    def __init__(self, obstacle_sprites, width, height, cell_size=TILESIZE, radius=FLOW_FIELD_RADIUS):
+        """
+        Initialize a flow field (Dijkstra map) over the walkable cells of the map.
+
+        The field holds, for every cell within reach of the target, the path cost to the target and
+        the neighbour to step to next, so any number of enemies can follow it with one lookup each.
+        It follows changes to the obstacle group: opened cells (e.g. a destroyed door) are patched in,
+        while closed cells make the next update recompute the field.
+
+        Parameters:
+        - obstacle_sprites: ObstacleGroup whose hitboxes block cells.
+        - width: Number of columns of the map.
+        - height: Number of rows of the map.
+        - cell_size: Size of each cell in pixels.
+        - radius: Largest path length from the target, in cells, the field extends to.
+        """
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.limit = radius * STRAIGHT_COST
+
+        self.blocked = array('H', [0]) * (width * height)  # Number of obstacles covering each cell
+        self.distance = array('i', [UNREACHED]) * (width * height)  # Path cost to the target
+        self.steps = bytearray(width * height)  # Index of the neighbour to step to
+        self.links = [None] * (width * height)  # Cell -> walkable (neighbour, cost, step back) moves, built on first use
+        self.reached = []  # Cells with a distance, cleared before the next computation
+        self.target = None  # Cell the field leads to
+        self.dirty = True  # Whether the field must be computed from scratch
+
+        for sprite in obstacle_sprites:
+            self.obstacle_added(sprite)
+        obstacle_sprites.listeners.append(self)
+
+    def covered_cells(self, rect):
+        """Yield the cells the rect overlaps, so obstacles smaller than a cell (e.g. tree trunks) still block one."""
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        size = self.cell_size
+        first_col = max(rect.left // size, 0)
+        first_row = max(rect.top // size, 0)
+        last_col = min((rect.right - 1) // size, self.width - 1)
+        last_row = min((rect.bottom - 1) // size, self.height - 1)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                yield row * self.width + col
+
+    def obstacle_added(self, sprite):
+        """Block the cells of an obstacle that joined the obstacle group."""
+        for cell in self.covered_cells(sprite.hitbox):
+            self.blocked[cell] += 1
+            if self.blocked[cell] == 1:
+                self.unlink(cell)
+            if self.distance[cell] != UNREACHED:
+                self.dirty = True  # Paths through the cell are gone
+
+    def obstacle_removed(self, sprite):
+        """Unblock the cells of an obstacle that left the obstacle group and patch them into the field."""
+        opened = []
+        for cell in self.covered_cells(sprite.hitbox):
+            self.blocked[cell] -= 1
+            if not self.blocked[cell]:
+                self.unlink(cell)
+                opened.append(cell)
+        if opened and not self.dirty:
+            self.repair(opened)
+
+    def neighbours(self, cell):
+        """Yield (index into NEIGHBOURS, neighbour cell) for the neighbours of a cell inside the map."""
+        row, col = divmod(cell, self.width)
+        for index, (col_offset, row_offset, cost) in enumerate(NEIGHBOURS):
+            neighbour_col = col + col_offset
+            neighbour_row = row + row_offset
+            if 0 <= neighbour_col < self.width and 0 <= neighbour_row < self.height:
+                yield index, neighbour_row * self.width + neighbour_col
+
+    def build_links(self, cell):
+        """Return the moves from a cell to its walkable neighbours as (neighbour, cost, step back) tuples."""
+        blocked = self.blocked
+        width = self.width
+        row, col = divmod(cell, width)
+        links = []
+        for index, neighbour in self.neighbours(cell):
+            col_offset, row_offset, cost = NEIGHBOURS[index]
+            if blocked[neighbour]:
+                continue
+            if col_offset and row_offset and (blocked[row * width + col + col_offset] or blocked[(row + row_offset) * width + col]):
+                continue  # No cutting past a blocked corner
+            links.append((neighbour, cost, OPPOSITE[index]))
+        self.links[cell] = links
+        return links
+
+    def unlink(self, cell):
+        """Drop the cached moves around a cell whose blocked state changed."""
+        self.links[cell] = None
+        for index, neighbour in self.neighbours(cell):
+            self.links[neighbour] = None
+
+    def invalidate(self):
+        """Compute the field from scratch on the next update."""
+        self.dirty = True
+
+    def cell_of(self, pos):
+        """Return the cell containing a position, or None outside the map."""
+        col = int(pos[0]) // self.cell_size
+        row = int(pos[1]) // self.cell_size
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return row * self.width + col
+        return None
+
+    def update(self, target_pos):
+        """Compute the field toward the given position if it moved to another cell or obstacles closed."""
+        target = self.cell_of(target_pos)
+        if target != self.target or self.dirty:
+            self.compute(target)
+
+    def compute(self, target):
+        """Compute the field from scratch toward the target cell."""
+        distance = self.distance
+        for cell in self.reached:
+            distance[cell] = UNREACHED
+        self.reached = []
+        self.target = target
+        self.dirty = False
+
+        if target is not None:
+            distance[target] = 0
+            self.reached.append(target)
+            self.expand([(0, target)])
+
+    def repair(self, opened):
+        """
+        Patch newly opened cells into the field. Opening cells only shortens paths,
+        so the search restarts from the reached cells around them instead of from the target.
+        """
+        distance = self.distance
+        heap = []
+        for cell in opened:
+            for index, neighbour in self.neighbours(cell):
+                if distance[neighbour] != UNREACHED:
+                    heappush(heap, (distance[neighbour], neighbour))
+        self.expand(heap)
+
+    def expand(self, heap):
+        """Run Dijkstra's algorithm from the cells on the heap, up to the field's radius."""
+        distance = self.distance
+        steps = self.steps
+        links = self.links
+        reached = self.reached
+        limit = self.limit
+
+        while heap:
+            cost, cell = heappop(heap)
+            if cost > distance[cell] or cost >= limit:
+                continue
+            for neighbour, step_cost, step in links[cell] or self.build_links(cell):
+                new_cost = cost + step_cost
+                old_cost = distance[neighbour]
+                if old_cost == UNREACHED:
+                    reached.append(neighbour)
+                elif new_cost >= old_cost:
+                    continue
+                distance[neighbour] = new_cost
+                steps[neighbour] = step
+                heappush(heap, (new_cost, neighbour))
+
+    def direction(self, pos):
+        """
+        Return the (x, y) offset from a position to the center of the next cell on its path to the target,
+        or None if the position is outside the field or in the target cell, where heading straight is best.
+        """
+        cell = self.cell_of(pos)
+        if cell is None or self.distance[cell] <= 0:
+            return None
+        col_offset, row_offset, cost = NEIGHBOURS[self.steps[cell]]
+        row, col = divmod(cell, self.width)
+        half = self.cell_size // 2
+        return ((col + col_offset) * self.cell_size + half - pos[0],
+                (row + row_offset) * self.cell_size + half - pos[1])
@@ -0,0 +1,62 @@
+"""
+Headless simulation mode.
+Runs the level logic (movement, enemy AI, attacks, end condition) without a window or audio device,
+driven by a scripted input source and stepped as fast as the CPU allows.
+
+Usage:
+    python headless.py [ticks] [script]
+
+The optional script file holds lines of the form '<keys> <ticks>', e.g. 'd 120' or 'w+space 10'.
+"""
+
+import pygame, sys, time
+from settings import *  # Import game settings
+from controls import ScriptedInput  # Import the scripted input source
+from level import Level  # Import the Level class
+
+def init_headless():
+    """
+    Initialize the pygame modules the game logic needs, without a display or audio.
+    """
+    pygame.init()
+    pygame.mixer.quit()  # Sounds are replaced by silent stand-ins
+
+def create_headless_level(input_source=None):
+    """
+    Create a level that runs without drawing or playing sounds.
+
+    Parameters:
+    - input_source: Input source polled once per tick. Defaults to a script with no keys held.
+    """
+    if input_source is None:
+        input_source = ScriptedInput(())
+    return Level(headless=True, input_source=input_source)
+
+def run_headless(level, ticks):
+    """
+    Step a headless level for the given number of ticks, or until the game is over.
+    Returns the number of ticks run.
+    """
+    for tick in range(ticks):
+        if level.game_over:
+            return tick
+        level.run()
+    return ticks
+
+if __name__ == '__main__':
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else TICK_RATE * 60
+    init_headless()
+
+    input_source = None
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as script_file:
+            input_source = ScriptedInput.from_lines(script_file.readlines())
+
+    level = create_headless_level(input_source)
+    start = time.perf_counter()
+    ticks_run = run_headless(level, ticks)
+    elapsed = time.perf_counter() - start
+
+    player = level.player
+    print(f"Ran {ticks_run} ticks in {elapsed:.2f}s ({ticks_run / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"Player at {player.rect.center}, health {player.health}, gold {player.gold}, keys {player.keys}, game over {level.game_over}")
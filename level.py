@@ -1,42 +1,84 @@
 import pygame
 import os
+from bisect import insort  # Import insort to keep the static draw list presorted
+from heapq import merge  # Import merge to combine the static and moving draw lists
 from settings import *  # Import game settings
 from tile import Tile  # Import the Tile class
 from player import Player  # Import the Player class
-from support import *  # Import supporting functions
 from weapon import Weapon  # Import the Weapon class
 from ui import UI  # Import the UI class
-from enemy import Enemy  # Import the Enemy class
+from enemy import Enemy, EnemyGroup  # Import the Enemy class and its group
 from particles import AnimationPlayer  # Import the AnimationPlayer class
 from magic import MagicPlayer  # Import the MagicPlayer class
 from upgrade import Upgrade  # Import the Upgrade class
-from random import choice, randint  # Import choice and randint functions for randomness
+from spatial import ObstacleGroup, DynamicGroup, SpatialHash  # Import the spatial indexing helpers
+from floor import ChunkedFloor  # Import the chunked floor renderer
+from assets import asset_cache  # Import the shared asset cache
+from audio import audio_manager  # Import the shared audio manager
+from level_data import load_level  # Import the compiled level loader
+from controls import KeyboardInput  # Import the live keyboard input source
+from support import get_display_size, tileset_tile  # Import the display size and tileset helpers
+from profiler import profiler  # Import the frame profiler
+from sim_clock import SimulationClock  # Import the simulation clock
+from entity import Entity  # Import the Entity base class
+from snapshot import LevelSnapshot  # Import the in-memory level snapshot
+from flowfield import FlowField  # Import the shared enemy path field
+from collision import CollisionMap, Boundary  # Import the boundary bitmap and merged obstacles
+import random  # Import random for the level's seeded random number generator
+import copy  # Import copy for the level's own balance tables
 
 class Level:
-    def __init__(self):
+    def __init__(self, headless=False, input_source=None, layouts=None, seed=None, balance=None):
+        """
+        Initialize the level.
+
+        Parameters:
+        - headless: Run only the game logic, without drawing to a display or playing sounds.
+        - input_source: Source of key states polled once per tick. Defaults to the live keyboard.
+        - layouts: Dictionary of layer name to LevelLayer to build the map from. Defaults to the compiled level_layers.
+        - seed: Seed of the level's random number generator. A random seed is chosen if None.
+        - balance: Overrides of monster_data, magic_data and the player's upgrade_cost for this level only,
+          e.g. {'monster_data': {'raccoon': {'health': 200}}, 'upgrade_cost': {'attack': 50}}.
+        """
         # Get the display surface
-        self.display_surface = pygame.display.get_surface()
+        self.headless = headless
+        self.layouts = layouts
+        self.display_surface = None if headless else pygame.display.get_surface()
+        self.input_source = input_source if input_source is not None else KeyboardInput()
         self.game_paused = False  # Game pause state
+        self.clock = SimulationClock()  # Simulated time for cooldowns and timers
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)  # All game randomness comes from here so sessions can be replayed
+
+        # Balance tables: copies of the settings, so overrides never leak into other levels
+        self.balance = balance or {}
+        self.monster_data = copy.deepcopy(monster_data)
+        self.magic_data = copy.deepcopy(magic_data)
+        for name, table in (('monster_data', self.monster_data), ('magic_data', self.magic_data)):
+            for key, values in self.balance.get(name, {}).items():
+                table[key].update(values)
 
         # Sprite group setup
-        self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.visible_sprites = YSortCameraGroup(headless)
+        self.obstacle_sprites = ObstacleGroup()  # Grid-indexed; killed keys and doors leave the index
 
         # Attack sprites
         self.current_attack = None
         self.attack_sprites = pygame.sprite.Group()
-        self.attackable_sprites = pygame.sprite.Group()
+        self.attackable_sprites = DynamicGroup()  # Grid-indexed; enemies are re-filed as they move
+        self.enemy_sprites = EnemyGroup(monster_table=self.monster_data)  # Every living enemy, updated in one pass
 
         # Sprite setup
         self.create_map()
+        self.flow_field = FlowField(self.obstacle_sprites, *self.map_size) if FLOW_FIELD_ENABLED else None
 
         # User interface
         self.ui = UI()
-        self.upgrade = Upgrade(self.player)
+        self.upgrade = Upgrade(self.player, self.input_source, self.clock)
 
         # Particles
-        self.animation_player = AnimationPlayer()
-        self.magic_player = MagicPlayer(self.animation_player)
+        self.animation_player = AnimationPlayer(self.rng)
+        self.magic_player = MagicPlayer(self.animation_player, self.rng)
 
         # Initialize end components
         self.target_tiles = [(86, 78), (87, 78)]  # End condition tiles
@@ -44,87 +86,142 @@ class Level:
         self.end_screen_displayed = False
         self.end_screen_surface = None
 
+        # Snapshot of the freshly created map, restored by reset_level
+        self.take_snapshot()
+
     def create_map(self):
         """
-        Create the game map by loading CSV layouts and graphics.
+        Create the game map by loading the compiled level layouts and graphics.
         Initialize player, enemies, and other entities based on the map.
         """
-        # Paths to CSV files
-        csv_file_boundary = os.path.join("level", "level_0_floorblocks.csv")
-        csv_file_entities = os.path.join("level", "level_0_entities.csv")
-        csv_file_trees = os.path.join("level", "level_0_trees.csv")
-        csv_file_keys = os.path.join("level", "level_0_key.csv")
-        csv_file_key1 = os.path.join("level", "level_0_key1.csv")
-        csv_file_cave = os.path.join("level", "level_0_cave.csv")
-        csv_file_door = os.path.join("level", "level_0_door.csv")
-
-        # Import layouts from CSV files
-        layouts = {
-            'boundary': import_csv_layout(csv_file_boundary),
-            'entities': import_csv_layout(csv_file_entities),
-            'trees': import_csv_layout(csv_file_trees),
-            'keys': import_csv_layout(csv_file_keys),
-            'key1': import_csv_layout(csv_file_key1),
-            'cave': import_csv_layout(csv_file_cave),
-            'door': import_csv_layout(csv_file_door)
-        }
+        # Load the compiled level layers (compiled from the CSV files on first use)
+        layouts = self.layouts if self.layouts is not None else load_level(level_layers)
+        self.map_size = (max(layout.width for layout in layouts.values()), max(layout.height for layout in layouts.values()))
+
+        # Static boundaries: a walkability bitmap whose solid cells are merged into a few large obstacles
+        boundary = layouts.get('boundary')
+        self.collision_map = CollisionMap.from_layer(boundary) if boundary is not None else CollisionMap(*self.map_size)
+        for rect in self.collision_map.merged_rects():
+            Boundary(rect, [self.obstacle_sprites])
 
         # Import graphics
         graphics = {
-            'trees': import_folder('graphics/trees'),
-            'keys': import_folder('graphics/keys'),
-            'cave': [pygame.image.load('graphics/cave/cave.png').convert_alpha()],
-            'door': [pygame.image.load('graphics/door/door.png').convert_alpha()]
+            'trees': asset_cache.folder('graphics/trees'),
+            'keys': asset_cache.folder('graphics/keys'),
+            'cave': [asset_cache.image('graphics/cave/cave.png')],
+            'door': [asset_cache.image('graphics/door/door.png')]
         }
 
         # Create tiles and entities based on the layouts
         for style, layout in layouts.items():
-            for row_index, row in enumerate(layout):
-                for col_index, col in enumerate(row):
-                    if col != '-1':
-                        x = col_index * TILESIZE
-                        y = row_index * TILESIZE
-                        if style == 'boundary':
-                            Tile((x, y), [self.obstacle_sprites], 'invisible')
-                        elif style == 'entities':
-                            if col == '167':
-                                self.player = Player(
-                                    (1220, 570),
-                                    [self.visible_sprites],
-                                    self.obstacle_sprites,
-                                    self.create_attack,
-                                    self.destroy_attack,
-                                    self.create_magic)
-                            else:
-                                # Assign monster type based on the CSV value
-                                if col == '27': monster_name = 'raccoon'
-                                elif col == '29': monster_name = 'slime'
-                                elif col == '33': monster_name = 'cyclops'
-                                elif col == '34': monster_name = 'flam'
-                                elif col == '35': monster_name = 'tengu'
-                                else: monster_name = 'spirit'
-                                Enemy(monster_name,
-                                      (x, y),
-                                      [self.visible_sprites, self.attackable_sprites],
-                                      self.obstacle_sprites,
-                                      self.damage_player,
-                                      self.trigger_death_particles,
-                                      self.add_gold)
-                        elif style == 'trees':
-                            surf = graphics['trees'][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'trees', surf)
-                        elif style == 'keys':
-                            surf = graphics['keys'][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'keys', surf)
-                        elif style == 'key1':
-                            surf = graphics['keys'][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'key1', surf)
-                        elif style == 'cave':
-                            surf = graphics['cave'][0]
-                            Tile((x, y,), [self.visible_sprites], 'cave', surf)
-                        elif style == 'door':
-                            surf = graphics['door'][0]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'door', surf)
+            if style == 'boundary':
+                continue  # Merged into Boundary obstacles above
+            for row_index, col_index, col in layout.items():
+                x = col_index * TILESIZE
+                y = row_index * TILESIZE
+                if style == 'entities':
+                    if col == 167:
+                        self.player = Player(
+                            (1220, 570),
+                            [self.visible_sprites],
+                            self.obstacle_sprites,
+                            self.create_attack,
+                            self.destroy_attack,
+                            self.create_magic,
+                            self.input_source,
+                            self.clock,
+                            self.magic_data)
+                        self.player.upgrade_cost.update(self.balance.get('upgrade_cost', {}))
+                        audio_manager.set_listener(self.player)  # Positioned sounds are heard from the player
+                    else:
+                        # Assign monster type based on the CSV value
+                        if col == 27: monster_name = 'raccoon'
+                        elif col == 29: monster_name = 'slime'
+                        elif col == 33: monster_name = 'cyclops'
+                        elif col == 34: monster_name = 'flam'
+                        elif col == 35: monster_name = 'tengu'
+                        else: monster_name = 'spirit'
+                        Enemy(monster_name,
+                              (x, y),
+                              [self.visible_sprites, self.attackable_sprites, self.enemy_sprites],
+                              self.obstacle_sprites,
+                              self.damage_player,
+                              self.trigger_death_particles,
+                              self.add_gold,
+                              self.clock,
+                              self.monster_data)
+                elif style == 'trees':
+                    surf = graphics['trees'][col]
+                    Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'trees', surf)
+                elif style == 'keys':
+                    surf = graphics['keys'][col]
+                    Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'keys', surf)
+                elif style == 'key1':
+                    surf = graphics['keys'][col]
+                    Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'key1', surf)
+                elif style == 'cave':
+                    surf = graphics['cave'][0]
+                    Tile((x, y,), [self.visible_sprites], 'cave', surf)
+                elif style == 'door':
+                    surf = graphics['door'][0]
+                    Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 'door', surf)
+
+        # Tall decorations only change what is drawn, so headless levels leave them out
+        if not self.headless:
+            self.create_decorations()
+
+    def create_decorations(self):
+        """
+        Create Y-sorted sprites for the tall decoration layers. Each group of touching tiles (e.g. a tent
+        and the log lying on it) becomes one sprite, so it is sorted against entities as a whole instead
+        of tile by tile. Flat decorations are baked into the floor chunks instead.
+
+        When the decorations are painted into the floor image, a sprite is cut out of the floor in the
+        shape of its tiles, so it looks exactly like the floor until something walks behind it.
+        """
+        tileset = asset_cache.image(TILESET_PATH)
+        layouts = list(load_level(decoration_layers).values())
+        if not layouts:
+            return
+        width = max(layout.width for layout in layouts)
+
+        # Cell -> tile ids of the layers covering it, bottom first
+        stacks = {}
+        for layout in layouts:
+            for row, col, value in layout.items():
+                stacks.setdefault(row * width + col, []).append(value)
+
+        unvisited = set(stacks)
+        while unvisited:
+            # Collect the cells connected to one cell, side by side
+            stack = [unvisited.pop()]
+            cells = []
+            while stack:
+                index = stack.pop()
+                cells.append(index)
+                row, col = divmod(index, width)
+                for neighbour_row, neighbour_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                    neighbour = neighbour_row * width + neighbour_col
+                    if 0 <= neighbour_col < width and neighbour in unvisited:
+                        unvisited.remove(neighbour)
+                        stack.append(neighbour)
+
+            rows, cols = zip(*(divmod(index, width) for index in cells))
+            left, top = min(cols), min(rows)
+            surf = pygame.Surface(((max(cols) - left + 1) * TILESIZE, (max(rows) - top + 1) * TILESIZE), pygame.SRCALPHA)
+            for index in cells:
+                row, col = divmod(index, width)
+                for value in stacks[index]:
+                    surf.blit(tileset_tile(tileset, value), ((col - left) * TILESIZE, (row - top) * TILESIZE))
+            pos = (left * TILESIZE, top * TILESIZE)
+
+            if DECORATIONS_PAINTED:
+                # Keep the tiles' alpha as a mask and take the colors from the floor
+                surf.fill((255, 255, 255, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                mask = surf
+                surf = self.visible_sprites.floor.read(mask.get_rect(topleft=pos))
+                surf.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            Tile(pos, [self.visible_sprites], 'decoration', surf.convert_alpha())
 
     def create_attack(self):
         """Create an attack if there isn't an active one."""
@@ -148,19 +245,19 @@ class Level:
         """Handle the logic for player attacks, including collisions."""
         if self.attack_sprites:
             for attack_sprite in self.attack_sprites:
-                collision_sprites = pygame.sprite.spritecollide(attack_sprite, self.attackable_sprites, False)
+                collision_sprites = self.attackable_sprites.collide(attack_sprite.rect)  # Only sprites in nearby cells are checked
                 if collision_sprites:
                     for target_sprite in collision_sprites:
                         if target_sprite.sprite_type == 'keys':
                             pos = target_sprite.rect.center
-                            for particle in range(randint(3, 6)):
+                            for particle in range(self.rng.randint(3, 6)):
                                 self.animation_player.create_destroy_particles(pos, [self.visible_sprites])
                             target_sprite.kill()
                             self.player.add_keys(1)  # Add 1 key to the player's count
                         elif target_sprite.sprite_type == 'key1':
                             if self.player.gold >= 2000:
                                 pos = target_sprite.rect.center
-                                for particle in range(randint(3, 6)):
+                                for particle in range(self.rng.randint(3, 6)):
                                     self.animation_player.create_destroy_particles(pos, [self.visible_sprites])
                                 target_sprite.kill()
                                 self.player.add_keys(1)  # Add 1 key to the player's count
@@ -168,7 +265,7 @@ class Level:
                         elif target_sprite.sprite_type == 'door':
                             if self.player.keys == 3:
                                 pos = target_sprite.rect.center
-                                for particle in range(randint(3, 6)):
+                                for particle in range(self.rng.randint(3, 6)):
                                     self.animation_player.create_destroy_particles(pos, [self.visible_sprites])
                                 target_sprite.kill()
                         elif hasattr(target_sprite, 'get_damage'):  # Check if target_sprite has get_damage method
@@ -179,7 +276,7 @@ class Level:
         if self.player.vulnerable:
             self.player.health -= amount
             self.player.vulnerable = False
-            self.player.hurt_time = pygame.time.get_ticks()
+            self.player.hurt_time = self.clock.get_ticks()
             self.animation_player.create_particles(attack_type, self.player.rect.center, [self.visible_sprites])
             if self.player.health <= 0:
                 self.player.health = 0
@@ -194,19 +291,44 @@ class Level:
         self.player.gold += amount
 
     def toggle_menu(self):
-        """Toggle the game pause state."""
-        self.game_paused = not self.game_paused
+        """Toggle the game pause state on the next tick."""
+        self.input_source.request_menu_toggle()
+
+    def take_snapshot(self):
+        """Record the current sprites as the state reset_level returns to, e.g. after changing the player's starting stats."""
+        self.snapshot = LevelSnapshot([
+            self.visible_sprites, self.obstacle_sprites, self.attack_sprites, self.attackable_sprites, self.enemy_sprites])
 
     def reset_level(self):
-        """Reset the level by reinitializing it."""
-        self.__init__()
+        """
+        Reset the level to the state it was created in, restoring the map from the in-memory snapshot.
+        Nothing is reloaded: the sprites, UI, upgrade menu and floor are reused.
+        """
+        self.animation_player.pool.release_all()
+        self.current_attack = None
+        self.snapshot.restore()
+        if self.flow_field is not None:
+            self.flow_field.invalidate()
+
+        # Timers and randomness start over, so a reset level plays like a new one with the same seed
+        self.clock.tick_count = 0
+        self.rng.seed(self.seed)
+
+        self.game_paused = False
+        self.game_over = False
+        self.end_screen_displayed = False
+        self.end_screen_surface = None
+        self.upgrade.selection_index = 0
+        self.upgrade.selection_time = None
+        self.upgrade.can_move = True
 
     def check_end_condition(self):
         """Check if the player has reached the end condition."""
         player_tile = self.player.rect.centerx // TILESIZE, self.player.rect.centery // TILESIZE
         if player_tile in self.target_tiles:
             self.game_over = True
-            self.display_end_screen()
+            if not self.headless:
+                self.display_end_screen()
 
     def display_end_screen(self):
         """Display the end screen when the game is over."""
@@ -223,9 +345,6 @@ class Level:
         prompt_rect = prompt_text.get_rect(center=(self.display_surface.get_width() // 2, self.display_surface.get_height() // 2 + 40))
         self.end_screen_surface.blit(prompt_text, prompt_rect)
 
-        self.display_surface.blit(self.end_screen_surface, (0, 0))
-        pygame.display.update()
-
     def handle_end_screen_input(self):
         """Handle user input on the end screen."""
         for event in pygame.event.get():
@@ -236,60 +355,169 @@ class Level:
                     pygame.quit()
                     exit()
 
-    def run(self):
-        """Run the game loop, updating sprites and handling input."""
+    def update(self):
+        """Advance the game logic by one simulation tick."""
+        self.input_source.poll()  # Sample the input once per tick
+        if self.input_source.menu_toggled:
+            self.game_paused = not self.game_paused
+
+        if self.game_over:
+            if self.end_screen_displayed:
+                self.handle_end_screen_input()
+        elif self.game_paused:
+            self.upgrade.update()
+        elif self.player.alive:
+            with profiler.section('sprite_update'):
+                self.enemy_sprites.wake(self.player)  # Only enemies near the player are simulated
+                self.visible_sprites.update()
+                self.enemy_sprites.update()
+                self.attackable_sprites.refresh(self.enemy_sprites.awake)  # Only awake enemies can have moved
+            with profiler.section('enemy_ai'):
+                if self.flow_field is not None:
+                    self.flow_field.update(self.player.hitbox.center)  # Recomputed only when the player changes tile
+                self.enemy_sprites.enemy_update(self.player, self.flow_field, self.attackable_sprites)
+            with profiler.section('attacks'):
+                self.player_attack_logic()
+            self.check_end_condition()
+        else:
+            self.reset_level()
+
+        self.clock.step()
+
+    def draw(self, alpha=1.0):
+        """
+        Draw the level.
+
+        Parameters:
+        - alpha: Fraction of a tick elapsed since the last update, used to interpolate moving entities.
+        """
         if self.end_screen_displayed:
             self.display_surface.blit(self.end_screen_surface, (0, 0))
-            pygame.display.update()
-            self.handle_end_screen_input()
-        else:
-            self.visible_sprites.custom_draw(self.player)
+            return
+
+        with profiler.section('draw'):
+            self.visible_sprites.custom_draw(self.player, alpha)
+        with profiler.section('ui'):
             self.ui.display(self.player)
 
-            if self.game_paused:
-                # Display upgrade menu
+        if self.game_paused:
+            # Display upgrade menu
+            with profiler.section('upgrade_menu'):
                 self.upgrade.display()
-            else:
-                # Run the game
-                if self.player.alive:
-                    self.visible_sprites.update()
-                    self.visible_sprites.enemy_update(self.player)
-                    self.player_attack_logic()
-                    self.check_end_condition()
-                else:
-                    self.reset_level()
+
+    def run(self):
+        """Run one simulation tick and draw the result (headless levels only update)."""
+        self.update()
+        if not self.headless:
+            self.draw()
 
 class YSortCameraGroup(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, headless=False):
         # General setup
         super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.half_width = self.display_surface.get_size()[0] // 2
-        self.half_height = self.display_surface.get_size()[1] // 2
+        self.display_surface = None if headless else pygame.display.get_surface()
+        display_size = get_display_size()
+        self.half_width = display_size[0] // 2
+        self.half_height = display_size[1] // 2
         self.offset = pygame.math.Vector2()
 
+        # Culling setup
+        self.view_rect = pygame.Rect((0, 0), display_size)  # Camera viewport in world space
+        self.static_index = SpatialHash(CULLING_CELL_SIZE)  # Spatial index of static tiles
+        self.static_sprites = []  # Static tiles presorted by their y-coordinate
+        self.static_rank = None  # Static tile -> position in static_sprites, rebuilt after changes
+        self.moving_sprites = {}  # Sprites that move and are re-sorted every frame
+        self.updated_sprites = {}  # Moving sprites this group updates; enemies are updated by their own group
+
         # Creating the floor
         self.png_path = os.path.join("level", "level_0_test.png")
-        self.floor_surf = pygame.image.load(self.png_path).convert()
-        self.floor_rect = self.floor_surf.get_rect(topleft=(0, 0))
+        self.floor = None if headless else ChunkedFloor(self.png_path, layer_paths=floor_layers)  # Only chunks on screen are drawn or kept in memory
+
+    def add_internal(self, sprite, layer=None):
+        """Add a sprite to the group, filing static tiles into the presorted draw list."""
+        super().add_internal(sprite, layer)
+        if isinstance(sprite, Tile):
+            insort(self.static_sprites, sprite, key=lambda tile: tile.rect.centery)
+            self.static_index.insert(sprite, sprite.rect)
+            self.static_rank = None
+        else:
+            self.moving_sprites[sprite] = None
+            if not isinstance(sprite, Enemy):
+                self.updated_sprites[sprite] = None
+
+    def empty(self):
+        """Remove every sprite, clearing the draw lists at once instead of one sprite at a time."""
+        for sprite in self.sprites():
+            pygame.sprite.Group.remove_internal(self, sprite)
+            sprite.remove_internal(self)
+        self.static_index.clear()
+        self.static_sprites.clear()
+        self.static_rank = None
+        self.moving_sprites.clear()
+        self.updated_sprites.clear()
+
+    def remove_internal(self, sprite):
+        """Remove a sprite from the group and from the draw lists."""
+        super().remove_internal(sprite)
+        if sprite in self.static_index:
+            self.static_sprites.remove(sprite)
+            self.static_index.remove(sprite)
+            self.static_rank = None
+        else:
+            del self.moving_sprites[sprite]
+            self.updated_sprites.pop(sprite, None)
+
+    def update(self, *args, **kwargs):
+        """
+        Update the moving sprites. Static tiles have nothing to update,
+        and enemies are updated by the enemy group, which skips sleeping ones.
+        """
+        for sprite in list(self.updated_sprites):
+            sprite.update(*args, **kwargs)
+
+    def visible_sprites_sorted(self):
+        """Return the sprites overlapping the viewport, sorted by their y-coordinate."""
+        view_rect = self.view_rect
+        view_rect.topleft = (int(self.offset.x), int(self.offset.y))
 
-    def custom_draw(self, player):
-        """Custom draw method to handle the camera and rendering."""
-        # Getting the offset
-        self.offset.x = player.rect.centerx - self.half_width
-        self.offset.y = player.rect.centery - self.half_height
+        if self.static_rank is None:
+            self.static_rank = {sprite: rank for rank, sprite in enumerate(self.static_sprites)}
+
+        static_sprites = [sprite for sprite in self.static_index.query(view_rect) if view_rect.colliderect(sprite.rect)]
+        static_sprites.sort(key=self.static_rank.__getitem__)
+        moving_sprites = [sprite for sprite in self.moving_sprites if view_rect.colliderect(sprite.rect)]
+        moving_sprites.sort(key=lambda sprite: sprite.rect.centery)
+
+        return merge(moving_sprites, static_sprites, key=lambda sprite: sprite.rect.centery)
+
+    def custom_draw(self, player, alpha=1.0):
+        """
+        Custom draw method to handle the camera and rendering.
+        Entities are drawn between their last two positions according to alpha.
+        """
+        # Getting the offset, following the interpolated player
+        player_dx, player_dy = player.interpolation_offset(alpha)
+        self.offset.x = player.rect.centerx + player_dx - self.half_width
+        self.offset.y = player.rect.centery + player_dy - self.half_height
 
         # Drawing the floor
-        floor_offset_pos = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surf, floor_offset_pos)
+        self.floor.draw(self.display_surface, self.offset)
 
         # Draw sprites sorted by their y-coordinate
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):
+        if CAMERA_CULLING:
+            sprites = self.visible_sprites_sorted()
+        else:
+            sprites = sorted(self.sprites(), key=lambda sprite: sprite.rect.centery)
+
+        interpolate = alpha < 1
+        drawn = 0
+        for sprite in sprites:
             offset_pos = sprite.rect.topleft - self.offset
+            if isinstance(sprite, Entity):
+                if sprite.hidden:
+                    continue  # Flickering while invulnerable
+                if interpolate:
+                    offset_pos += sprite.interpolation_offset(alpha)
             self.display_surface.blit(sprite.image, offset_pos)
-
-    def enemy_update(self, player):
-        """Update all enemy sprites."""
-        enemy_sprites = [sprite for sprite in self.sprites() if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'enemy']
-        for enemy in enemy_sprites:
-            enemy.enemy_update(player)
+            drawn += 1
+        profiler.count('sprites_drawn', drawn)
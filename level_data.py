@@ -0,0 +1,138 @@
+import os  # Import OS module for interacting with the operating system
+import sys  # Import sys to check the byte order of the platform
+import struct  # Import struct to pack the binary headers
+import hashlib  # Import hashlib to key the cache by the source files
+from array import array  # Import array for compact typed integer storage
+from settings import *  # Import game settings
+from support import import_csv_layout  # Import the CSV layout reader
+
+LEVEL_MAGIC = b'ALVL'  # Identifies compiled level files
+LEVEL_VERSION = 1  # Bump when the binary layout changes
+HEADER_FORMAT = '<4sHH'  # Magic, version, layer count
+LAYER_FORMAT = '<HHI'  # Width, height, number of non-empty cells
+
+class LevelLayer:
+    def __init__(self, name, width, height, cells, sparse=None):
+        """
+        Initialize a layer of tile ids.
+
+        Parameters:
+        - name: Name of the layer (e.g., 'boundary', 'entities').
+        - width: Number of columns.
+        - height: Number of rows.
+        - cells: array('i') of tile ids in row-major order, -1 for empty cells.
+        - sparse: array('I') of the indices of non-empty cells. Computed if not given.
+        """
+        self.name = name
+        self.width = width
+        self.height = height
+        self.cells = cells
+        if sparse is None:
+            sparse = array('I', (index for index, value in enumerate(cells) if value != -1))
+        self.sparse = sparse
+
+    def get(self, row, col):
+        """Return the tile id at the given cell."""
+        return self.cells[row * self.width + col]
+
+    def items(self):
+        """Yield (row, col, value) for every non-empty cell."""
+        cells = self.cells
+        width = self.width
+        for index in self.sparse:
+            row, col = divmod(index, width)
+            yield row, col, cells[index]
+
+def compile_csv_layer(name, path):
+    """
+    Compile a CSV layout into a LevelLayer.
+    """
+    layout = import_csv_layout(path)
+    height = len(layout)
+    width = len(layout[0]) if layout else 0
+    cells = array('i', (int(value) for row in layout for value in row))
+    return LevelLayer(name, width, height, cells)
+
+def write_level(path, layers):
+    """
+    Write layers to a compiled level file.
+    Arrays are stored little-endian regardless of the platform.
+    """
+    with open(path, 'wb') as level_file:
+        level_file.write(struct.pack(HEADER_FORMAT, LEVEL_MAGIC, LEVEL_VERSION, len(layers)))
+        for layer in layers.values():
+            name = layer.name.encode('utf-8')
+            level_file.write(struct.pack('<B', len(name)) + name)
+            level_file.write(struct.pack(LAYER_FORMAT, layer.width, layer.height, len(layer.sparse)))
+            for data in (layer.cells, layer.sparse):
+                if sys.byteorder == 'big':
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                data.tofile(level_file)
+
+def read_level(path):
+    """
+    Read layers from a compiled level file.
+    Returns a dictionary of layer name to LevelLayer.
+    """
+    layers = {}
+    with open(path, 'rb') as level_file:
+        magic, version, layer_count = struct.unpack(HEADER_FORMAT, level_file.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError(f"Unsupported level file: {path}")
+
+        for _ in range(layer_count):
+            name_length = level_file.read(1)[0]
+            name = level_file.read(name_length).decode('utf-8')
+            width, height, count = struct.unpack(LAYER_FORMAT, level_file.read(struct.calcsize(LAYER_FORMAT)))
+            cells = array('i')
+            cells.fromfile(level_file, width * height)
+            sparse = array('I')
+            sparse.fromfile(level_file, count)
+            if sys.byteorder == 'big':
+                cells.byteswap()
+                sparse.byteswap()
+            if sparse and max(sparse) >= len(cells):
+                raise ValueError(f"Damaged level file: {path}")
+            layers[name] = LevelLayer(name, width, height, cells, sparse)
+    return layers
+
+def source_hash(layer_paths):
+    """
+    Hash the layer names and the contents of their source files.
+    """
+    digest = hashlib.sha1(struct.pack('<H', LEVEL_VERSION))
+    for name, path in layer_paths.items():
+        digest.update(name.encode('utf-8') + b'\0')
+        with open(path, 'rb') as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+def load_level(layer_paths, cache_dir=os.path.join(CACHE_DIR, 'levels')):
+    """
+    Load the layers of a level, compiling the CSV files if no up-to-date compiled file exists.
+
+    Parameters:
+    - layer_paths: Dictionary of layer name to CSV path.
+    - cache_dir: Directory holding compiled level files.
+    """
+    cache_path = os.path.join(cache_dir, f'{source_hash(layer_paths)}.bin')
+    if os.path.exists(cache_path):
+        try:
+            return read_level(cache_path)
+        except (OSError, ValueError, EOFError, IndexError, struct.error):
+            pass  # Recompile a damaged or outdated file
+
+    layers = {name: compile_csv_layer(name, path) for name, path in layer_paths.items()}
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_level(cache_path + '.tmp', layers)
+        os.replace(cache_path + '.tmp', cache_path)  # Never leave a partial file under the final name
+    except OSError:
+        pass  # The level still loads, it is just compiled again next time
+    return layers
+
+if __name__ == '__main__':
+    # Compile the level ahead of time and print a summary
+    for layer in load_level(level_layers).values():
+        print(f"{layer.name}: {layer.width}x{layer.height}, {len(layer.sparse)} non-empty cells")
@@ -0,0 +1,196 @@
+"""
+Startup asset loader.
+Decodes images and sounds on a thread pool while the main thread converts the results to the display
+format and draws a progress screen, then reports how long each asset took.
+
+Usage:
+    python loader.py    Load every startup asset once and print the timing report
+"""
+
+import pygame, os, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from settings import *  # Import game settings
+from assets import asset_cache  # Import the shared asset cache
+from atlas import TextureAtlas, prepare_atlas, find_frames, sheet_path  # Import the texture atlas helpers
+from floor import ChunkedFloor  # Import the chunked floor renderer
+from level_data import load_level  # Import the compiled level loader
+from support import convert_image, natural_key  # Import the image helpers
+
+# Images loaded at startup that are not packed into the atlas
+STARTUP_IMAGES = [
+    os.path.join('graphics', 'player.png'),
+    os.path.join('graphics', 'gold', 'gold.png'),
+    'graphics/cave/cave.png',
+    'graphics/door/door.png',
+    TILESET_PATH
+]
+FLOOR_IMAGE = os.path.join('level', 'level_0_test.png')  # Floor image split into chunks before the first frame
+
+class LoadJob:
+    def __init__(self, name, kind, decode, finish=None):
+        """
+        Initialize a loading job.
+
+        Parameters:
+        - name: Name shown in the progress screen and report, usually the file path.
+        - kind: Kind of asset, e.g. 'image', 'sound' or 'cache'.
+        - decode: Function run on a worker thread; must not touch the display.
+        - finish: Function run on the main thread with the decoded result, e.g. to convert and store it.
+        """
+        self.name = name
+        self.kind = kind
+        self.decode = decode
+        self.finish = finish
+        self.decode_time = 0.0  # Milliseconds spent on the worker thread
+        self.finish_time = 0.0  # Milliseconds spent on the main thread
+
+    def run(self):
+        """Decode the asset, timing the work. Runs on a worker thread."""
+        start = time.perf_counter()
+        result = self.decode()
+        self.decode_time = (time.perf_counter() - start) * 1000
+        return result
+
+class StartupLoader:
+    def __init__(self, workers=LOADER_WORKERS):
+        """
+        Initialize a loader that runs decode jobs in parallel.
+
+        Parameters:
+        - workers: Number of worker threads. pygame releases the GIL while decoding files.
+        """
+        self.workers = workers
+        self.jobs = []
+        self.total_time = 0.0
+
+    def add(self, name, kind, decode, finish=None):
+        """Queue a job and return it."""
+        job = LoadJob(name, kind, decode, finish)
+        self.jobs.append(job)
+        return job
+
+    def add_image(self, path, alpha=True):
+        """Queue an image; it is converted on the main thread and stored in the asset cache."""
+        self.add(path, 'image', lambda: pygame.image.load(path),
+                 lambda surface: asset_cache.add_image(path, convert_image(surface, alpha), alpha))
+
+    def add_sound(self, path):
+        """Queue a sound, stored in the asset cache. Skipped when the mixer is not initialized."""
+        if pygame.mixer.get_init():
+            self.add(path, 'sound', lambda: pygame.mixer.Sound(path), lambda sound: asset_cache.add_sound(path, sound))
+
+    def add_folder(self, path):
+        """Queue every image of a folder, stored in the asset cache as one folder."""
+        names = sorted((name for name in os.listdir(path) if name.lower().endswith('.png')), key=natural_key)
+
+        def decode():
+            return [pygame.image.load(os.path.join(path, name)) for name in names]
+
+        def finish(surfaces):
+            asset_cache.add_folder(path, [convert_image(surface) for surface in surfaces])
+
+        self.add(path, 'folder', decode, finish)
+
+    def add_atlas(self):
+        """Queue the atlas sheets, building the atlas first if it is out of date. Returns False if there is no atlas."""
+        index = prepare_atlas()
+        if index is None:
+            return False
+
+        sheets = [None] * index['sheets']
+        remaining = [index['sheets']]
+
+        def sheet_job(number):
+            def finish(surface):
+                sheets[number] = surface
+                remaining[0] -= 1
+                if not remaining[0]:
+                    asset_cache.atlas = TextureAtlas(ATLAS_DIR, index, sheets)
+            self.add(sheet_path(ATLAS_DIR, number), 'atlas', lambda: pygame.image.load(sheet_path(ATLAS_DIR, number)), finish)
+
+        for number in range(index['sheets']):
+            sheet_job(number)
+        return True
+
+    def add_startup_assets(self):
+        """Queue everything the game loads before its first frame."""
+        # Sprite frames, from the atlas if there is one
+        if not (ATLAS_ENABLED and self.add_atlas()):
+            asset_cache.atlas = False
+            for folder in find_frames():
+                self.add_folder(folder)
+
+        for path in STARTUP_IMAGES:
+            self.add_image(path)
+
+        # Sound effects; the music is streamed when it starts, so it is not decoded here
+        for info in sound_data.values():
+            self.add_sound(info['path'])
+
+        # Caches built on first run: the floor chunks and the compiled levels
+        self.add(FLOOR_IMAGE, 'cache', lambda: ChunkedFloor(FLOOR_IMAGE, layer_paths=floor_layers))
+        self.add('level layers', 'cache', lambda: load_level(level_layers))
+        self.add('decoration layers', 'cache', lambda: load_level(decoration_layers))
+
+    def draw_progress(self, surface, font, done, name):
+        """Draw the loading screen with a progress bar and the asset loaded last."""
+        surface.fill('black')
+        width, height = surface.get_size()
+        bar_rect = pygame.Rect(0, 0, width // 2, BAR_HEIGHT)
+        bar_rect.center = (width // 2, height // 2)
+        fill_rect = bar_rect.copy()
+        fill_rect.width = bar_rect.width * done // max(len(self.jobs), 1)
+
+        pygame.draw.rect(surface, UI_BG_COLOR, bar_rect)
+        pygame.draw.rect(surface, TEXT_COLOR, fill_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, bar_rect, 3)
+
+        text_surf = font.render(f'Loading {name}', False, TEXT_COLOR)
+        surface.blit(text_surf, text_surf.get_rect(midtop=(bar_rect.centerx, bar_rect.bottom + 20)))
+        pygame.display.update()
+
+    def run(self, surface=None):
+        """
+        Run every queued job, drawing a progress screen on the given surface if there is one.
+        Decoding happens on worker threads; conversion and storing happen here on the main thread.
+        """
+        start = time.perf_counter()
+        font = pygame.font.Font(UI_FONT, int(UI_FONT_SIZE * 0.75)) if surface is not None else None
+        done = 0
+        name = ''
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(job.run): job for job in self.jobs}
+            while pending:
+                finished, _ = wait(pending, timeout=1 / 30, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = pending.pop(future)
+                    result = future.result()
+                    if job.finish is not None:
+                        finish_start = time.perf_counter()
+                        job.finish(result)
+                        job.finish_time = (time.perf_counter() - finish_start) * 1000
+                    done += 1
+                    name = job.name
+                if surface is not None:
+                    pygame.event.pump()  # Keep the window responsive
+                    self.draw_progress(surface, font, done, name)
+        self.total_time = (time.perf_counter() - start) * 1000
+
+    def report(self):
+        """Return the timing report as a list of lines, slowest assets first."""
+        lines = [f"{'asset':<48} {'kind':<7} {'decode ms':>10} {'main ms':>9}"]
+        for job in sorted(self.jobs, key=lambda job: job.decode_time + job.finish_time, reverse=True):
+            lines.append(f"{job.name:<48} {job.kind:<7} {job.decode_time:10.2f} {job.finish_time:9.2f}")
+        decode_time = sum(job.decode_time for job in self.jobs)
+        finish_time = sum(job.finish_time for job in self.jobs)
+        lines.append(f"{len(self.jobs)} assets in {self.total_time:.1f} ms on {self.workers} threads "
+                     f"({decode_time:.1f} ms decoding, {finish_time:.1f} ms on the main thread)")
+        return lines
+
+if __name__ == '__main__':
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    loader = StartupLoader()
+    loader.add_startup_assets()
+    loader.run(screen)
+    print('\n'.join(loader.report()))
@@ -1,15 +1,12 @@
 import pygame
 from settings import *  # Import game settings
-from random import randint  # Import randint for random number generation
+from audio import audio_manager  # Import the shared audio manager
 
 class MagicPlayer:
-    def __init__(self, animation_player):
-        # Initialize the MagicPlayer with an animation player
+    def __init__(self, animation_player, rng):
+        # Initialize the MagicPlayer with an animation player and the level's random number generator
         self.animation_player = animation_player
-        self.sounds = {
-            'heal': pygame.mixer.Sound('audio/attack/heal.wav'),  # Load healing sound
-            'flame': pygame.mixer.Sound('audio/attack/Fireball.wav')  # Load flame sound
-        }
+        self.rng = rng
 
     def heal(self, player, strength, cost, groups):
         """
@@ -18,8 +15,7 @@ class MagicPlayer:
         """
         if player.energy >= cost:
             # Play healing sound
-            self.sounds['heal'].set_volume(0.06)
-            self.sounds['heal'].play()
+            audio_manager.play('heal')
 
             # Increase player's health and decrease energy
             player.health += strength
@@ -43,8 +39,7 @@ class MagicPlayer:
             player.energy -= cost
 
             # Play flame sound
-            self.sounds['flame'].set_volume(0.016)
-            self.sounds['flame'].play()
+            audio_manager.play('flame')
 
             # Determine the direction of the flame attack
             if player.status.split("_")[0] == 'right':
@@ -60,11 +55,11 @@ class MagicPlayer:
             for i in range(1, 6):
                 if direction.x:  # Horizontal direction
                     offset_x = (direction.x * i) * TILESIZE
-                    x = player.rect.centerx + offset_x + randint(-TILESIZE // 3, TILESIZE // 3)
-                    y = player.rect.centery + randint(-TILESIZE // 3, TILESIZE // 3)
+                    x = player.rect.centerx + offset_x + self.rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    y = player.rect.centery + self.rng.randint(-TILESIZE // 3, TILESIZE // 3)
                     self.animation_player.create_particles('flame', (x, y), groups)
                 else:  # Vertical direction
                     offset_y = (direction.y * i) * TILESIZE
-                    x = player.rect.centerx + randint(-TILESIZE // 3, TILESIZE // 3)
-                    y = player.rect.centery + offset_y + randint(-TILESIZE // 3, TILESIZE // 3)
+                    x = player.rect.centerx + self.rng.randint(-TILESIZE // 3, TILESIZE // 3)
+                    y = player.rect.centery + offset_y + self.rng.randint(-TILESIZE // 3, TILESIZE // 3)
                     self.animation_player.create_particles('flame', (x, y), groups)
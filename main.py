@@ -5,44 +5,118 @@ Date: 7/25/2024
 Description: A simple adventure game using Pygame.
 """
 
-import pygame, sys
+import pygame, sys, time, argparse
 from settings import *  # Import settings such as WIDTH, HEIGHT, and FPS
 from level import Level  # Import the Level class
+from audio import audio_manager  # Import the shared audio manager
+from profiler import profiler  # Import the frame profiler
+from controls import KeyboardInput  # Import the live keyboard input source
+from replay import Recording, Recorder, RecordingInput, ReplayInput  # Import input recording and replay
+from loader import StartupLoader  # Import the startup asset loader
 
 class Game:
-    def __init__(self):
+    def __init__(self, record_path=None, replay_path=None, startup_report=False):
+        """
+        Initialize the game.
+
+        Parameters:
+        - record_path: File to record the session's input to when the game quits.
+        - replay_path: Recording to play back instead of reading the keyboard.
+        - startup_report: Print the per-asset load times and the time to the first frame.
+        """
         # General setup
+        self.start_time = time.perf_counter()
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))  # Set up the display window
         pygame.display.set_caption('Adventure')  # Set the window caption
         self.clock = pygame.time.Clock()  # Create a clock object to manage the game's frame rate
-        self.level = Level()  # Initialize the game level
+
+        # Decode the assets in the background behind a loading screen
+        self.loader = StartupLoader()
+        self.loader.add_startup_assets()
+        self.loader.run(self.screen)
+        self.startup_report = startup_report
+
+        # Input setup
+        self.record_path = record_path
+        self.recording = None
+        self.recorder = None
+        if replay_path:
+            recording = Recording.load(replay_path)
+            self.level = Level(input_source=ReplayInput(recording), seed=recording.seed)
+        elif record_path:
+            self.recording = Recording(seed=0)
+            self.level = Level(input_source=RecordingInput(KeyboardInput(), self.recording))
+            self.recording.seed = self.level.seed
+            self.recorder = Recorder(self.level, self.recording)
+        else:
+            self.level = Level()  # Initialize the game level
+
+        # Fixed timestep setup
+        self.tick_time = 1000 / TICK_RATE  # Length of a simulation tick in milliseconds
+        self.accumulator = 0.0  # Elapsed time not yet simulated
 
         # Sound setup
-        main_sound = pygame.mixer.Sound('audio/main.ogg')  # Load the main background sound
-        main_sound.set_volume(0.02)  # Set the volume for the sound
-        main_sound.play(loops=-1)  # Play the sound in a loop
+        audio_manager.preload()  # Load every sound effect up front
+        audio_manager.play_music('audio/main.ogg', 0.02)  # Loop the background music
+
+    def print_startup_report(self):
+        """Print the asset load times and the time from startup to the first displayed frame."""
+        self.startup_report = False
+        print('\n'.join(self.loader.report()))
+        print(f"Time to first frame: {(time.perf_counter() - self.start_time) * 1000:.1f} ms")
 
     def run(self):
         # Main game loop
         while True:
+            profiler.begin_frame()  # Start recording the frame if profiling is enabled
+
             # Event handling
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:  # If the user closes the window
-                    pygame.quit()  # Quit the game
-                    sys.exit()  # Exit the system
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_m:  # If the 'm' key is pressed
-                        self.level.toggle_menu()  # Toggle the menu
-                    elif event.key == pygame.K_ESCAPE and self.level.game_paused:  # If 'ESC' key is pressed and the game is paused
-                        self.level.toggle_menu()  # Toggle the menu
-
-            # Update the game screen
+            with profiler.section('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:  # If the user closes the window
+                        if self.recording is not None:
+                            self.recording.save(self.record_path)  # Save the recorded session
+                        pygame.quit()  # Quit the game
+                        sys.exit()  # Exit the system
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_m:  # If the 'm' key is pressed
+                            self.level.toggle_menu()  # Toggle the menu
+                        elif event.key == pygame.K_ESCAPE and self.level.game_paused:  # If 'ESC' key is pressed and the game is paused
+                            self.level.toggle_menu()  # Toggle the menu
+                        elif event.key == pygame.K_F3:  # If 'F3' is pressed
+                            profiler.toggle_overlay()  # Toggle the profiler overlay
+                        elif event.key == pygame.K_F4 and profiler.frames:  # If 'F4' is pressed after profiling
+                            print(f"Profiler trace written to {profiler.dump_chrome_trace()}")
+
+            # Run as many fixed simulation ticks as the elapsed time calls for
+            with profiler.section('simulation'):
+                while self.accumulator >= self.tick_time:
+                    self.level.update()  # Run the level logic for one tick
+                    if self.recorder is not None:
+                        self.recorder.record_tick()  # Record the state checksum of the tick
+                    self.accumulator -= self.tick_time
+                    profiler.count('ticks')
+
+            # Draw the game screen, blending entities between the last two ticks
             self.screen.fill('black')  # Fill the screen with black color
-            self.level.run()  # Run the level logic
-            pygame.display.update()  # Update the display
-            self.clock.tick(FPS)  # Maintain the game frame rate
+            with profiler.section('render'):
+                self.level.draw(self.accumulator / self.tick_time)
+            with profiler.section('display_update'):
+                pygame.display.update()  # Update the display
+            if self.startup_report:
+                self.print_startup_report()
+            profiler.end_frame()  # The frame ends before the wait for the next one
+
+            # Limit the frame rate and bank the elapsed time for the next ticks
+            self.accumulator += min(self.clock.tick(FPS), MAX_FRAME_TIME)
 
 if __name__ == '__main__':
-    game = Game()  # Create a Game object
+    parser = argparse.ArgumentParser(description='Adventure game.')
+    parser.add_argument('--record', metavar='FILE', help='record the session input to FILE on quit')
+    parser.add_argument('--replay', metavar='FILE', help='play back a recorded session')
+    parser.add_argument('--startup-report', action='store_true', help='print asset load times and the time to the first frame')
+    args = parser.parse_args()
+
+    game = Game(args.record, args.replay, args.startup_report)  # Create a Game object
     game.run()  # Run the game
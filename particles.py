@@ -1,34 +1,40 @@
 import pygame
-from support import import_folder  # Import the function to import images from folders
-from random import choice  # Import choice for random selection
+from assets import asset_cache  # Import the shared asset cache
+from settings import *  # Import game settings
 
 class AnimationPlayer:
-    def __init__(self):
+    def __init__(self, rng):
+        # Random number generator shared with the level
+        self.rng = rng
+
+        # Reusable particle effects
+        self.pool = ParticlePool()
+
         # Initialize animation frames for various effects
         self.frames = {
             # Magic effects
-            'flame': import_folder('graphics/particles/fire_frames'),
-            'heal': import_folder('graphics/particles/heal_frames'),
-            'aura': import_folder('graphics/particles/aura'),
+            'flame': asset_cache.folder('graphics/particles/fire_frames'),
+            'heal': asset_cache.folder('graphics/particles/heal_frames'),
+            'aura': asset_cache.folder('graphics/particles/aura'),
 
             # Attack effects
-            'claw': import_folder('graphics/particles/claw'),
-            'slash': import_folder('graphics/particles/slash'),
+            'claw': asset_cache.folder('graphics/particles/claw'),
+            'slash': asset_cache.folder('graphics/particles/slash'),
 
             # Monster death effects
-            'spirit': import_folder('graphics/particles/smoke_orange'),
-            'slime': import_folder('graphics/particles/smoke'),
-            'raccoon': import_folder('graphics/particles/nova'),
-            'cyclops': import_folder('graphics/particles/nova'),
-            'flam': import_folder('graphics/particles/smoke_orange'),
-            'tengu': import_folder('graphics/particles/nova'),
+            'spirit': asset_cache.folder('graphics/particles/smoke_orange'),
+            'slime': asset_cache.folder('graphics/particles/smoke'),
+            'raccoon': asset_cache.folder('graphics/particles/nova'),
+            'cyclops': asset_cache.folder('graphics/particles/nova'),
+            'flam': asset_cache.folder('graphics/particles/smoke_orange'),
+            'tengu': asset_cache.folder('graphics/particles/nova'),
 
             # Destroy particles
             'destroy': (
-                import_folder('graphics/particles/destroy1'),
-                import_folder('graphics/particles/destroy2'),
-                self.reflect_images(import_folder('graphics/particles/destroy1')),
-                self.reflect_images(import_folder('graphics/particles/destroy2'))
+                asset_cache.folder('graphics/particles/destroy1'),
+                asset_cache.folder('graphics/particles/destroy2'),
+                self.reflect_images(asset_cache.folder('graphics/particles/destroy1')),
+                self.reflect_images(asset_cache.folder('graphics/particles/destroy2'))
             )
         }
 
@@ -47,35 +53,95 @@ class AnimationPlayer:
         """
         Create destroy particles at the given position.
         """
-        animation_frames = choice(self.frames['destroy'])  # Randomly select a destroy animation
-        ParticleEffect(pos, animation_frames, groups)
+        animation_frames = self.rng.choice(self.frames['destroy'])  # Randomly select a destroy animation
+        self.pool.spawn(pos, animation_frames, groups)
 
     def create_particles(self, animation_type, pos, groups):
         """
         Create particles of the specified animation type at the given position.
         """
         animation_frames = self.frames[animation_type]  # Get the frames for the specified animation type
-        ParticleEffect(pos, animation_frames, groups)
+        self.pool.spawn(pos, animation_frames, groups)
+
+class ParticlePool:
+    def __init__(self, capacity=PARTICLE_POOL_SIZE):
+        """
+        Initialize a pool of reusable particle effects.
+
+        Parameters:
+        - capacity: Number of particles allocated up front. When every particle is in use, the pool grows
+          by one instead of cutting a playing effect short, so it settles at the most effects seen at once.
+        """
+        self.free = []  # Idle particles ready to be spawned
+        self.active = {}  # Active particles, oldest first
+        self.capacity = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity):
+        """Grow the pool to at least the given capacity."""
+        while self.capacity < capacity:
+            self.free.append(ParticleEffect(self))
+            self.capacity += 1
+
+    def spawn(self, pos, animation_frames, groups):
+        """
+        Start a particle effect from the pool at the given position.
+        """
+        if not self.free:
+            self.reserve(self.capacity + 1)
+        particle = self.free.pop()
+
+        self.active[particle] = None
+        particle.start(pos, animation_frames, groups)
+        return particle
+
+    def release(self, particle):
+        """Return a finished particle to the pool."""
+        if particle in self.active:
+            del self.active[particle]
+            self.free.append(particle)
+
+    def release_all(self):
+        """Stop every active particle and return it to the pool, e.g. when the level is reset."""
+        for particle in self.active:
+            particle.kill()
+            self.free.append(particle)
+        self.active.clear()
 
 class ParticleEffect(pygame.sprite.Sprite):
-    def __init__(self, pos, animation_frames, groups):
-        # Initialize the particle effect sprite
-        super().__init__(groups)
+    def __init__(self, pool):
+        """
+        Initialize an idle particle effect owned by a pool.
+        """
+        super().__init__()
         self.sprite_type = 'magic'
+        self.pool = pool
         self.frame_index = 0
         self.animation_speed = 0.15
+        self.frames = None
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def start(self, pos, animation_frames, groups):
+        """
+        Start playing an animation at the given position.
+        """
+        self.frame_index = 0
         self.frames = animation_frames
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_rect(center=pos)
+        self.image = self.frames[0]
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
+        self.add(groups)
 
     def animate(self):
         """
         Animate the particle effect by updating the frame index.
-        Kill the sprite if the animation is complete.
+        Return the particle to its pool when the animation is complete.
         """
         self.frame_index += self.animation_speed
         if self.frame_index >= len(self.frames):
             self.kill()  # Remove the sprite from all groups
+            self.pool.release(self)
         else:
             self.image = self.frames[int(self.frame_index)]
 
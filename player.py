@@ -1,15 +1,22 @@
 import pygame
 import os
 from settings import *  # Import game settings
-from support import import_folder  # Import the function to import images from folders
+from assets import asset_cache  # Import the shared asset cache
+from audio import audio_manager  # Import the shared audio manager
 from entity import Entity  # Import the Entity base class
 
 class Player(Entity):
-    def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic):
+    # Attributes that change during play, restored by LevelSnapshot; alive is only set when the player dies
+    snapshot_fields = Entity.snapshot_fields + (
+        'attacking', 'attack_time', 'weapon_index', 'weapon', 'magic_index', 'magic', 'can_switch_magic',
+        'magic_switch_time', 'stats', 'upgrade_cost', 'health', 'energy', 'gold', 'speed', 'keys',
+        'vulnerable', 'hurt_time', 'alive')
+
+    def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic, input_source, clock, magic_table=magic_data):
         # Initialize the Player class
-        super().__init__(groups)
+        super().__init__(groups, clock)
         self.image_path = os.path.join("graphics", "player.png")
-        self.image = pygame.image.load(self.image_path).convert_alpha()
+        self.image = asset_cache.image(self.image_path)
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-6, HITBOX_OFFSET['player'])
 
@@ -30,10 +37,14 @@ class Player(Entity):
         self.weapon = list(weapon_data.keys())[self.weapon_index]
         self.switch_duration_cooldown = 200
 
+        # Input
+        self.input_source = input_source  # Keyboard or scripted key state, polled once per tick
+
         # Magic
         self.create_magic = create_magic
+        self.magic_table = magic_table  # Spell strengths and costs of this level (magic_data with any balance overrides)
         self.magic_index = 0
-        self.magic = list(magic_data.keys())[self.magic_index]
+        self.magic = list(self.magic_table.keys())[self.magic_index]
         self.can_switch_magic = True
         self.magic_switch_time = None
 
@@ -41,6 +52,7 @@ class Player(Entity):
         self.stats = {'health': 100, 'energy': 60, 'attack': 10, 'magic': 4, 'speed': 5}
         self.max_stats = {'health': 300, 'energy': 140, 'attack': 20, 'magic': 10, 'speed': 10}
         self.upgrade_cost = {'health': 100, 'energy': 100, 'attack': 100, 'magic': 100, 'speed': 100}
+        self.stat_names = list(self.stats)  # Stat names in upgrade menu order, for lookups by index
         self.health = self.stats['health']
         self.energy = self.stats['energy']
         self.gold = 0
@@ -54,10 +66,6 @@ class Player(Entity):
         self.hurt_time = None
         self.invulnerability_duration = 500
 
-        # Import sound
-        self.weapon_attack_sound = pygame.mixer.Sound('audio/attack/sword.wav')
-        self.weapon_attack_sound.set_volume(0.015)
-
     def import_player_assets(self):
         """
         Import player animations from the specified folder.
@@ -71,13 +79,13 @@ class Player(Entity):
 
         for animation in self.animations.keys():
             full_path = character_path + animation
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = asset_cache.folder(full_path)
 
     def input(self):
         """
         Handle player input for movement, attacks, and magic.
         """
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
 
         if not self.attacking:
             # Movement input
@@ -102,31 +110,31 @@ class Player(Entity):
         # Attack input
         if keys[pygame.K_SPACE] and not self.attacking:
             self.attacking = True
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = self.clock.get_ticks()
             self.create_attack()
-            self.weapon_attack_sound.play()
+            audio_manager.play('sword')
 
         # Magic input
         if keys[pygame.K_LCTRL] and not self.attacking:
             self.attacking = True
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = self.clock.get_ticks()
 
-            style = list(magic_data.keys())[self.magic_index]
-            strength = list(magic_data.values())[self.magic_index]['strength'] + self.stats['magic']
-            cost = list(magic_data.values())[self.magic_index]['cost']
+            style = list(self.magic_table.keys())[self.magic_index]
+            strength = list(self.magic_table.values())[self.magic_index]['strength'] + self.stats['magic']
+            cost = list(self.magic_table.values())[self.magic_index]['cost']
             self.create_magic(style, strength, cost)
 
         # Switch magic input
         if keys[pygame.K_e] and self.can_switch_magic:
             self.can_switch_magic = False
-            self.magic_switch_time = pygame.time.get_ticks()
+            self.magic_switch_time = self.clock.get_ticks()
 
-            if self.magic_index < len(list(magic_data.keys())) - 1:
+            if self.magic_index < len(list(self.magic_table.keys())) - 1:
                 self.magic_index += 1
             else:
                 self.magic_index = 0
 
-            self.magic = list(magic_data.keys())[self.magic_index]
+            self.magic = list(self.magic_table.keys())[self.magic_index]
 
     def get_status(self):
         """
@@ -152,7 +160,7 @@ class Player(Entity):
         """
         Handle cooldowns for attacks, magic switching, and invulnerability.
         """
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
 
         if self.attacking:
             if current_time - self.attack_time >= self.attack_cooldown:
@@ -182,17 +190,13 @@ class Player(Entity):
             else:
                 self.frame_index = 0
 
+        # Flicker effect when not vulnerable: the camera skips hidden entities
+        self.hidden = not self.vulnerable and not self.wave_value()
+
         # Set the image
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(center=self.hitbox.center)
         
-        # Flicker effect when not vulnerable
-        if not self.vulnerable:
-            alpha = self.wave_value()
-            self.image.set_alpha(alpha)
-        else:
-            self.image.set_alpha(255)
-        
     def get_full_weapon_damage(self):
         """
         Calculate the full weapon damage including base and weapon-specific damage.
@@ -206,20 +210,20 @@ class Player(Entity):
         Calculate the full magic damage including base and spell-specific damage.
         """
         base_damage = self.stats['magic']
-        spell_damage = magic_data[self.magic]['strength']
+        spell_damage = self.magic_table[self.magic]['strength']
         return base_damage + spell_damage
 
     def get_value_by_index(self, index):
         """
         Get the value of a stat by its index.
         """
-        return list(self.stats.values())[index]
+        return self.stats[self.stat_names[index]]
 
     def get_cost_by_index(self, index):
         """
         Get the upgrade cost of a stat by its index.
         """
-        return list(self.upgrade_cost.values())[index]
+        return self.upgrade_cost[self.stat_names[index]]
 
     def energy_recovery(self):
         """
@@ -0,0 +1,126 @@
+import json  # Import json to write Chrome trace files
+import time  # Import time for high resolution timers
+from collections import deque  # Import deque to keep a bounded frame history
+from contextlib import nullcontext  # Import nullcontext for disabled sections
+from settings import *  # Import game settings
+
+class ProfileSection:
+    def __init__(self, profiler, name):
+        """
+        Initialize a timed section of a frame.
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+class FrameProfiler:
+    def __init__(self, history=PROFILER_HISTORY):
+        """
+        Initialize an opt-in profiler for the phases of each frame.
+
+        Parameters:
+        - history: Number of recent frames kept for the overlay and trace dumps.
+        """
+        self.enabled = PROFILER_ENABLED
+        self.overlay_visible = False
+        self.frames = deque(maxlen=history)  # Finished frames, oldest first
+        self.frame = None  # Frame being recorded
+        self.origin = time.perf_counter()  # Trace timestamps are relative to this
+        self.disabled_section = nullcontext()
+
+    def toggle_overlay(self):
+        """Toggle the overlay. Profiling runs while the overlay is visible or PROFILER_ENABLED is set."""
+        self.overlay_visible = not self.overlay_visible
+        self.enabled = self.overlay_visible or PROFILER_ENABLED
+        self.frame = None
+
+    def begin_frame(self):
+        """Start recording a new frame."""
+        if self.enabled:
+            self.frame = {'start': time.perf_counter(), 'sections': [], 'times': {}, 'counters': {}}
+
+    def end_frame(self):
+        """Finish the current frame and add it to the history."""
+        frame = self.frame
+        if frame is not None:
+            frame['end'] = time.perf_counter()
+            self.frames.append(frame)
+            self.frame = None
+
+    def section(self, name):
+        """
+        Return a context manager that times a section of the frame.
+        Does nothing unless a frame is being recorded.
+        """
+        if self.frame is None:
+            return self.disabled_section
+        return ProfileSection(self, name)
+
+    def record(self, name, start, end):
+        """Record a finished section."""
+        frame = self.frame
+        if frame is not None:
+            frame['sections'].append((name, start, end))
+            frame['times'][name] = frame['times'].get(name, 0.0) + (end - start) * 1000
+
+    def count(self, name, amount=1):
+        """Add to a per-frame counter, such as sprites drawn or collision checks."""
+        frame = self.frame
+        if frame is not None:
+            frame['counters'][name] = frame['counters'].get(name, 0) + amount
+
+    def averages(self):
+        """
+        Return the average section times (ms), counters and total frame time over the history.
+        """
+        if not self.frames:
+            return {}, {}, 0.0
+
+        times = {}
+        counters = {}
+        total = 0.0
+        for frame in self.frames:
+            total += (frame['end'] - frame['start']) * 1000
+            for name, value in frame['times'].items():
+                times[name] = times.get(name, 0.0) + value
+            for name, value in frame['counters'].items():
+                counters[name] = counters.get(name, 0) + value
+
+        count = len(self.frames)
+        return ({name: value / count for name, value in times.items()},
+                {name: value / count for name, value in counters.items()},
+                total / count)
+
+    def dump_chrome_trace(self, path=PROFILER_TRACE_PATH):
+        """
+        Write the frame history as a Chrome trace (open it in chrome://tracing or Perfetto).
+        """
+        def microseconds(seconds):
+            return round((seconds - self.origin) * 1_000_000, 1)
+
+        events = []
+        for frame in self.frames:
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': microseconds(frame['start']),
+                           'dur': round((frame['end'] - frame['start']) * 1_000_000, 1)})
+            for name, start, end in frame['sections']:
+                events.append({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                               'ts': microseconds(start), 'dur': round((end - start) * 1_000_000, 1)})
+            if frame['counters']:
+                events.append({'name': 'counters', 'ph': 'C', 'pid': 0, 'tid': 0,
+                               'ts': microseconds(frame['start']), 'args': frame['counters']})
+
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+        return path
+
+# Process-wide profiler used by the game loop, the level and the UI
+profiler = FrameProfiler()
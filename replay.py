@@ -0,0 +1,199 @@
+"""
+Deterministic input recording and replay.
+A recording holds the level's random seed and one key mask per simulation tick, optionally with a
+checksum of the game state after each tick, so a session can be replayed bit-for-bit and any desync
+is reported at the tick it happens.
+
+Usage:
+    python replay.py <recording>    Replay headless as fast as possible and verify the checksums
+"""
+
+import pygame, sys, time, struct, zlib
+from array import array  # Import array for compact per-tick storage
+from settings import *  # Import game settings
+from controls import InputSource, KeyState, MENU_TOGGLE  # Import the input source helpers
+
+REPLAY_MAGIC = b'ARPL'  # Identifies recording files
+REPLAY_VERSION = 1  # Bump when the file layout changes
+HEADER_FORMAT = '<4sHIHBI'  # Magic, version, seed, tick rate, has checksums, tick count
+
+# Keys stored in a recording, one bit each; the order is part of the file format
+RECORDED_KEYS = [
+    pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+    pygame.K_SPACE, pygame.K_LCTRL, pygame.K_e,
+    pygame.K_LEFT, pygame.K_RIGHT, MENU_TOGGLE
+]
+
+def encode_keys(keys, menu_toggled):
+    """Pack a key state and the menu toggle into a bit mask."""
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        pressed = menu_toggled if key == MENU_TOGGLE else keys[key]
+        if pressed:
+            mask |= 1 << bit
+    return mask
+
+def decode_keys(mask):
+    """Unpack a bit mask into a key state and the menu toggle."""
+    keys = KeyState(key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit))
+    return keys, keys[MENU_TOGGLE]
+
+def state_checksum(level):
+    """
+    Return a CRC32 of the game state: simulation time, player state and every living enemy.
+    """
+    player = level.player
+    data = bytearray(struct.pack('<IiiddiiB?', level.clock.tick_count, player.hitbox.x, player.hitbox.y,
+                                 player.health, player.energy, int(player.gold), player.keys,
+                                 player.magic_index, level.game_paused))
+    for value in player.stats.values():
+        data += struct.pack('<d', value)
+    for enemy in level.enemy_sprites:
+        data += struct.pack('<iid', enemy.hitbox.x, enemy.hitbox.y, enemy.health)
+    return zlib.crc32(data)
+
+class Recording:
+    def __init__(self, seed, tick_rate=TICK_RATE, masks=None, checksums=None):
+        """
+        Initialize a recording.
+
+        Parameters:
+        - seed: Seed of the level's random number generator.
+        - tick_rate: Simulation ticks per second the recording was made at.
+        - masks: array('H') of per-tick key masks.
+        - checksums: array('I') of per-tick state checksums, or None when not recorded.
+        """
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.masks = masks if masks is not None else array('H')
+        self.checksums = checksums
+
+    def save(self, path):
+        """Write the recording to a file."""
+        with open(path, 'wb') as replay_file:
+            replay_file.write(struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.seed,
+                                          self.tick_rate, self.checksums is not None, len(self.masks)))
+            for data in (self.masks, self.checksums):
+                if data is not None:
+                    if sys.byteorder == 'big':
+                        data = array(data.typecode, data)
+                        data.byteswap()
+                    data.tofile(replay_file)
+
+    @classmethod
+    def load(cls, path):
+        """Read a recording from a file."""
+        with open(path, 'rb') as replay_file:
+            magic, version, seed, tick_rate, has_checksums, ticks = struct.unpack(
+                HEADER_FORMAT, replay_file.read(struct.calcsize(HEADER_FORMAT)))
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ValueError(f"Unsupported recording: {path}")
+
+            masks = array('H')
+            masks.fromfile(replay_file, ticks)
+            checksums = None
+            if has_checksums:
+                checksums = array('I')
+                checksums.fromfile(replay_file, ticks)
+            if sys.byteorder == 'big':
+                masks.byteswap()
+                if checksums is not None:
+                    checksums.byteswap()
+        return cls(seed, tick_rate, masks, checksums)
+
+class RecordingInput(InputSource):
+    def __init__(self, source, recording):
+        """
+        Initialize an input source that records another source tick by tick.
+
+        Parameters:
+        - source: Input source being recorded (e.g. KeyboardInput).
+        - recording: Recording the key masks are appended to.
+        """
+        super().__init__()
+        self.source = source
+        self.recording = recording
+
+    def next_tick(self):
+        """Poll the recorded source."""
+        self.source.poll()
+        return self.source.get_pressed(), self.source.menu_toggled
+
+    def poll(self):
+        """Poll the source and record the resulting key state."""
+        super().poll()
+        self.recording.masks.append(encode_keys(self.keys, self.menu_toggled))
+
+class ReplayInput(InputSource):
+    def __init__(self, recording):
+        """
+        Initialize an input source that plays back a recording.
+        """
+        super().__init__()
+        self.recording = recording
+        self.tick = 0
+
+    @property
+    def finished(self):
+        """Whether every recorded tick has been played."""
+        return self.tick >= len(self.recording.masks)
+
+    def request_menu_toggle(self):
+        """Ignore live menu toggles; the recorded ones are the only ones played back."""
+
+    def next_tick(self):
+        """Return the next recorded key state. No keys are held after the end."""
+        if self.finished:
+            return KeyState(), False
+        mask = self.recording.masks[self.tick]
+        self.tick += 1
+        return decode_keys(mask)
+
+class Recorder:
+    def __init__(self, level, recording):
+        """
+        Initialize a recorder that appends a state checksum after every tick of a level.
+        """
+        self.level = level
+        self.recording = recording
+        if recording.checksums is None:
+            recording.checksums = array('I')
+
+    def record_tick(self):
+        """Record the checksum of the tick that just ran."""
+        self.recording.checksums.append(state_checksum(self.level))
+
+def verify(recording, level):
+    """
+    Replay a recording on a headless level, comparing checksums after every tick.
+    Returns the first tick whose state differs, or None if the replay matches.
+    """
+    for tick in range(len(recording.masks)):
+        level.update()
+        if recording.checksums is not None and state_checksum(level) != recording.checksums[tick]:
+            return tick
+    return None
+
+if __name__ == '__main__':
+    from headless import init_headless  # Import the headless setup
+    from level import Level  # Import the Level class
+
+    recording = Recording.load(sys.argv[1])
+    if recording.tick_rate != TICK_RATE:
+        print(f"Recorded at {recording.tick_rate} ticks/s but the game runs at {TICK_RATE}; replay may desync")
+
+    init_headless()
+    level = Level(headless=True, input_source=ReplayInput(recording), seed=recording.seed)
+    start = time.perf_counter()
+    desync = verify(recording, level)
+    elapsed = time.perf_counter() - start
+
+    ticks = len(recording.masks) if desync is None else desync + 1
+    print(f"Replayed {ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if recording.checksums is None:
+        print("Recording has no checksums; nothing verified")
+    elif desync is None:
+        print("Replay matches the recording")
+    else:
+        print(f"Desync at tick {desync}")
+        sys.exit(1)
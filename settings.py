@@ -1,9 +1,62 @@
 # Screen settings
 WIDTH = 1280  # Width of the game window
 HEIGHT = 720  # Height of the game window
-FPS = 60  # Frames per second
+FPS = 120  # Maximum frames rendered per second (0 for no limit)
+TICK_RATE = 60  # Simulation ticks per second; movement and animation speeds are per tick
+MAX_FRAME_TIME = 250  # Longest frame (ms) the simulation catches up on before dropping time
 TILESIZE = 64  # Size of each tile in pixels
 
+# Camera settings
+CAMERA_CULLING = True  # Only sort and draw sprites that overlap the camera viewport
+CULLING_CELL_SIZE = TILESIZE * 4  # Cell size of the spatial index used to find visible static sprites
+
+# Floor settings
+FLOOR_CHUNK_SIZE = 512  # Width and height of each floor chunk in pixels
+FLOOR_CHUNK_BUDGET = 48 * 1024 * 1024  # Maximum bytes of floor chunks kept in memory
+TILESET_PATH = 'graphics/64x64.png'  # Tileset the decoration layers' tile ids index into
+
+# Particle settings
+PARTICLE_POOL_SIZE = 64  # Particle effects allocated up front and reused
+
+# Enemy settings
+ENEMY_SECTOR_SIZE = TILESIZE * 8  # Width and height of the map sectors enemies are filed into
+ENEMY_ACTIVATION_MARGIN = TILESIZE * 2  # Enemies this much farther than the screen edge or any notice radius are still simulated; covers half the largest enemy sprite
+FLOW_FIELD_ENABLED = True  # Moving enemies follow a shared path field to the player instead of heading straight at them
+ENEMY_SEPARATION_RADIUS = TILESIZE  # Enemies closer than this to each other steer apart
+ENEMY_SEPARATION_WEIGHT = 1.0  # Strength of the steering apart relative to chasing the player (0 to disable)
+DYNAMIC_CELL_SIZE = TILESIZE * 2  # Cell size of the spatial index of enemies and other attackable sprites
+FLOW_FIELD_RADIUS = 20  # Longest path, in tiles, the field extends from the player; enemies farther away head straight
+
+# Profiler settings
+PROFILER_ENABLED = False  # Record frame timings from startup (F3 toggles the overlay, F4 writes a trace)
+PROFILER_HISTORY = 120  # Number of recent frames kept for the overlay and trace dumps
+PROFILER_TRACE_PATH = 'profile_trace.json'  # Chrome trace file written by F4
+
+# Audio settings
+AUDIO_CHANNELS = 16  # Mixer channels shared by all sound effects (music is streamed separately)
+AUDIO_DEDUPE_WINDOW = 50  # Repeated triggers of a sound within this many milliseconds are dropped
+AUDIO_HEARING_RADIUS = WIDTH  # Positioned sounds farther than this from the player are culled (0 to disable)
+AUDIO_ATTENUATION = True  # Fade positioned sounds with distance from the player
+
+# Cache settings
+CACHE_DIR = 'cache'  # Directory for generated asset caches
+
+# Startup loader settings
+LOADER_WORKERS = 4  # Threads decoding images and sounds while the loading screen is shown
+
+# Texture atlas settings
+ATLAS_ENABLED = True  # Load sprite frames from packed sheets instead of one file per frame
+ATLAS_FOLDERS = ['graphics/player', 'graphics/enemies', 'graphics/particles', 'graphics/keys', 'graphics/trees', 'graphics/weapons']  # Image folders packed into the atlas
+ATLAS_SHEET_SIZE = 2048  # Maximum width and height of an atlas sheet
+ATLAS_PADDING = 1  # Transparent pixels between packed images
+ATLAS_DIR = CACHE_DIR + '/atlas'  # Directory of the atlas sheets and index
+
+# Environment settings
+ENV_ENEMY_SLOTS = 8  # Nearest enemies described in an environment observation
+ENV_OBJECTIVE_SLOTS = 4  # Keys and doors described in an environment observation
+ENV_VIEW_RADIUS = WIDTH  # Enemies farther than this from the player are left out of observations
+ENV_MAX_TICKS = TICK_RATE * 60 * 5  # Ticks after which an environment episode is cut off
+
 # Hitbox offsets for different objects
 HITBOX_OFFSET = {
     'player': -26,
@@ -12,7 +65,8 @@ HITBOX_OFFSET = {
     'keys': -30,
     'key1': -30,
     'door': -30,
-    'cave': 0
+    'cave': 0,
+    'decoration': 0
 }
 
 # UI settings
@@ -22,6 +76,7 @@ ENERGY_BAR_WIDTH = 140  # Width of the energy bar
 ITEM_BOX_SIZE = 80  # Size of the item box
 UI_FONT = 'graphics/font/joystix.ttf'  # Font used for UI text
 UI_FONT_SIZE = 18  # Font size for UI text
+UI_TEXT_CACHE_SIZE = 64  # Rendered HUD text surfaces kept for reuse
 
 # General colors
 WATER_COLOR = '#71ddee'  # Color of the water
@@ -40,6 +95,29 @@ BAR_COLOR = '#EEEEEE'  # Color of the bar in the upgrade menu
 BAR_COLOR_SELECTED = '#111111'  # Color of the selected bar in the upgrade menu
 UPGRADE_BG_COLOR_SELECTED = '#EEEEEE'  # Background color of the selected item in the upgrade menu
 
+# Level layers, in the order they are created
+level_layers = {
+    'boundary': 'level/level_0_floorblocks.csv',
+    'entities': 'level/level_0_entities.csv',
+    'trees': 'level/level_0_trees.csv',
+    'keys': 'level/level_0_key.csv',
+    'key1': 'level/level_0_key1.csv',
+    'cave': 'level/level_0_cave.csv',
+    'door': 'level/level_0_door.csv'
+}
+
+# Flat decoration layers baked into the floor chunks at load time, in the order they are stacked.
+# level_0's grass, water, cliff, rocks and bushes are already painted into level_0_test.png.
+floor_layers = {}
+
+# Tall decoration layers drawn as Y-sorted sprites, so entities can walk behind them, in the order they are stacked.
+# The logs are included because one lies on the tent.
+decoration_layers = {
+    'tent': 'level/level_0_tent.csv',
+    'logs': 'level/level_0_logs.csv'
+}
+DECORATIONS_PAINTED = True  # The tall decorations are painted into the floor image too; their sprites take its pixels
+
 # Weapon data
 weapon_data = {
     'sword': {'cooldown': 100, 'damage': 15, 'graphic': '/graphics/weapons/sword.png'}
@@ -51,6 +129,18 @@ magic_data = {
     'heal' : {'strength': 20, 'cost': 10, 'graphic': 'graphics/particles/heal.png'}
 }
 
+# Sound data: file, volume and the most copies of the sound that may play at once
+sound_data = {
+    'sword': {'path': 'audio/attack/sword.wav', 'volume': 0.015, 'voices': 2},
+    'heal': {'path': 'audio/attack/heal.wav', 'volume': 0.06, 'voices': 1},
+    'flame': {'path': 'audio/attack/Fireball.wav', 'volume': 0.016, 'voices': 2},
+    'hit': {'path': 'audio/attack/Hit.wav', 'volume': 0.02, 'voices': 3},
+    'death': {'path': 'audio/attack/death.wav', 'volume': 0.02, 'voices': 3},
+    'fireball': {'path': 'audio/enemies/fireball.wav', 'volume': 0.02, 'voices': 2},
+    'slash': {'path': 'audio/enemies/slash.wav', 'volume': 0.02, 'voices': 2},
+    'claw': {'path': 'audio/enemies/claw.wav', 'volume': 0.02, 'voices': 2}
+}
+
 # Enemy data
 monster_data = {
     'spirit': {
@@ -58,7 +148,7 @@ monster_data = {
         'gold': 150,
         'damage': 10,
         'attack_type': 'slash',
-        'attack_sound': 'audio/enemies/fireball.wav',
+        'attack_sound': 'fireball',
         'speed': 2,
         'resistance': 3,
         'attack_radius': 50,
@@ -69,7 +159,7 @@ monster_data = {
         'gold': 160,
         'damage': 5,
         'attack_type': 'slash',
-        'attack_sound': 'audio/enemies/slash.wav',
+        'attack_sound': 'slash',
         'speed': 3,
         'resistance': 3,
         'attack_radius': 50,
@@ -80,7 +170,7 @@ monster_data = {
         'gold': 300,
         'damage': 20,
         'attack_type': 'claw',
-        'attack_sound': 'audio/enemies/claw.wav',
+        'attack_sound': 'claw',
         'speed': 2,
         'resistance': 3,
         'attack_radius': 110,
@@ -91,7 +181,7 @@ monster_data = {
         'gold': 300,
         'damage': 20,
         'attack_type': 'claw',
-        'attack_sound': 'audio/enemies/claw.wav',
+        'attack_sound': 'claw',
         'speed': 2,
         'resistance': 3,
         'attack_radius': 100,
@@ -102,7 +192,7 @@ monster_data = {
         'gold': 300,
         'damage': 20,
         'attack_type': 'claw',
-        'attack_sound': 'audio/enemies/claw.wav',
+        'attack_sound': 'claw',
         'speed': 2,
         'resistance': 3,
         'attack_radius': 110,
@@ -113,7 +203,7 @@ monster_data = {
         'gold': 300,
         'damage': 20,
         'attack_type': 'claw',
-        'attack_sound': 'audio/enemies/claw.wav',
+        'attack_sound': 'claw',
         'speed': 2,
         'resistance': 3,
         'attack_radius': 100,
@@ -0,0 +1,23 @@
+from settings import *  # Import game settings
+
+class SimulationClock:
+    def __init__(self, tick_rate=TICK_RATE):
+        """
+        Initialize a clock that measures simulated time in fixed ticks.
+
+        Cooldowns and timers read this clock instead of the wall clock, so game timing
+        stays the same when frames are dropped or the simulation runs faster than real time.
+
+        Parameters:
+        - tick_rate: Number of simulation ticks per second.
+        """
+        self.tick_rate = tick_rate
+        self.tick_count = 0
+
+    def step(self):
+        """Advance the clock by one tick."""
+        self.tick_count += 1
+
+    def get_ticks(self):
+        """Return the simulated time in milliseconds, like pygame.time.get_ticks()."""
+        return self.tick_count * 1000 // self.tick_rate
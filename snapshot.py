@@ -0,0 +1,75 @@
+import pygame  # Import Pygame for game development
+
+def copy_value(value):
+    """
+    Return a copy of an attribute value that later changes to the sprite cannot affect.
+    Rects, vectors and dictionaries (e.g. the player's stats) are copied; frames and other values are shared.
+    """
+    return value.copy() if isinstance(value, (pygame.Rect, pygame.math.Vector2, dict)) else value
+
+def copy_state(state):
+    """Return a copy of a dictionary of attribute values."""
+    return {name: copy_value(value) for name, value in state.items()}
+
+def record_state(sprite):
+    """
+    Return a copy of the game-state attributes a sprite declares in snapshot_fields.
+    Declared attributes the sprite does not have yet are left out, so restoring removes them again.
+    """
+    attributes = vars(sprite)
+    return copy_state({name: attributes[name] for name in getattr(sprite, 'snapshot_fields', ()) if name in attributes})
+
+class LevelSnapshot:
+    def __init__(self, groups):
+        """
+        Record the sprites of a level and which groups they belong to, e.g. right after the map is created.
+        Only the attributes each sprite class lists in snapshot_fields are recorded; assets, callbacks and
+        group membership are left alone.
+
+        Parameters:
+        - groups: The level's sprite groups, in the order they were created.
+        """
+        self.groups = [(group, group.sprites()) for group in groups]  # Group -> its sprites, in group order
+
+        sprites = {}
+        for group, members in self.groups:
+            for sprite in members:
+                sprites[sprite] = None
+        self.states = [(sprite, record_state(sprite)) for sprite in sprites]
+
+    def restore(self):
+        """
+        Put every recorded sprite back in its recorded state and groups, dropping sprites created since
+        (weapons, particles, magic). Killed tiles and enemies come back; nothing is reloaded from disk.
+        """
+        # Groups index sprites by position, so sprites that moved are re-added along with the ones that left
+        moved = {sprite for sprite, state in self.states
+                 if any(vars(sprite).get(name) != state[name] for name in ('rect', 'hitbox') if name in state)}
+
+        # Sprites only leave a group or join it at the end, so each group is rebuilt from the first difference on,
+        # in the recorded order so update and collision order match a fresh level
+        rebuilt = []
+        for group, members in self.groups:
+            current = group.sprites()
+            same = 0
+            for sprite, member in zip(current, members):
+                if sprite is not member or sprite in moved:
+                    break
+                same += 1
+            if same == len(current) == len(members):
+                continue
+            if same:
+                group.remove(*current[same:])
+            else:
+                group.empty()
+            rebuilt.append((group, members[same:]))
+
+        for sprite, state in self.states:
+            for name in getattr(sprite, 'snapshot_fields', ()):
+                if name in state:
+                    setattr(sprite, name, copy_value(state[name]))
+                elif name in vars(sprite):
+                    delattr(sprite, name)  # Set after the snapshot, e.g. the player's alive flag
+
+        for group, members in rebuilt:
+            group.add(*members)
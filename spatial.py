@@ -0,0 +1,156 @@
+import pygame  # Import Pygame for game development
+from settings import *  # Import game settings
+
+class SpatialHash:
+    def __init__(self, cell_size=TILESIZE):
+        """
+        Initialize a uniform grid that buckets objects by the cells their rect covers.
+
+        Parameters:
+        - cell_size: Size of each grid cell in pixels. Defaults to TILESIZE.
+        """
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> {obj: None}; dicts keep query order deterministic
+        self.object_cells = {}  # obj -> list of cells the object occupies
+
+    def cell_range(self, rect):
+        """
+        Return the (first_col, first_row, last_col, last_row) cells covered by a rect.
+        """
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, obj, rect):
+        """
+        Insert an object into every cell its rect covers.
+        Re-inserting an object moves it to the cells of the new rect.
+        """
+        if obj in self.object_cells:
+            self.remove(obj)
+
+        first_col, first_row, last_col, last_row = self.cell_range(rect)
+        occupied = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = (col, row)
+                self.cells.setdefault(cell, {})[obj] = None
+                occupied.append(cell)
+        self.object_cells[obj] = occupied
+
+    def remove(self, obj):
+        """
+        Remove an object from the grid. Unknown objects are ignored.
+        """
+        for cell in self.object_cells.pop(obj, ()):
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, obj, rect):
+        """
+        Re-file an object after its rect changed. Objects that stay in the same cells are left alone.
+        """
+        occupied = self.object_cells.get(obj)
+        if occupied:
+            first_col, first_row, last_col, last_row = self.cell_range(rect)
+            if occupied[0] == (first_col, first_row) and occupied[-1] == (last_col, last_row):
+                return
+        self.insert(obj, rect)
+
+    def query(self, rect):
+        """
+        Return the objects stored in the cells covered by a rect.
+        Each object appears once, in a deterministic order.
+        """
+        first_col, first_row, last_col, last_row = self.cell_range(rect)
+        cells = self.cells
+
+        # Fast path for the common case of a rect inside a single cell
+        if first_col == last_col and first_row == last_row:
+            return list(cells.get((first_col, first_row), ()))
+
+        found = {}
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return list(found)
+
+    def clear(self):
+        """Remove every object from the grid."""
+        self.cells.clear()
+        self.object_cells.clear()
+
+    def __len__(self):
+        return len(self.object_cells)
+
+    def __contains__(self, obj):
+        return obj in self.object_cells
+
+class ObstacleGroup(pygame.sprite.Group):
+    def __init__(self, *sprites, cell_size=TILESIZE):
+        """
+        Initialize a sprite group that indexes its members' hitboxes in a spatial hash.
+        Members are assumed to be static: their hitbox is indexed when they join the group
+        and dropped again when they leave it (for example through kill()).
+        Listeners (e.g. a FlowField) are told about every obstacle that joins or leaves.
+        """
+        self.grid = SpatialHash(cell_size)
+        self.listeners = []  # Objects with obstacle_added(sprite) and obstacle_removed(sprite) methods
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        """Add a sprite to the group and index its hitbox."""
+        super().add_internal(sprite, layer)
+        self.grid.insert(sprite, sprite.hitbox)
+        for listener in self.listeners:
+            listener.obstacle_added(sprite)
+
+    def remove_internal(self, sprite):
+        """Remove a sprite from the group and from the index."""
+        super().remove_internal(sprite)
+        self.grid.remove(sprite)
+        for listener in self.listeners:
+            listener.obstacle_removed(sprite)
+
+    def query(self, rect):
+        """Return the obstacles whose grid cells overlap the given rect."""
+        return self.grid.query(rect)
+
+class DynamicGroup(pygame.sprite.Group):
+    def __init__(self, *sprites, cell_size=DYNAMIC_CELL_SIZE):
+        """
+        Initialize a sprite group that indexes its members' rects in a spatial hash, including members that move.
+        Moving members are re-filed by refresh() once per tick, after they moved;
+        only those that crossed into other cells touch the index.
+        """
+        self.grid = SpatialHash(cell_size)
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        """Add a sprite to the group and index its rect."""
+        super().add_internal(sprite, layer)
+        self.grid.insert(sprite, sprite.rect)
+
+    def remove_internal(self, sprite):
+        """Remove a sprite from the group and from the index."""
+        super().remove_internal(sprite)
+        self.grid.remove(sprite)
+
+    def refresh(self, sprites):
+        """Re-file the given sprites after they moved; sprites that left the group are skipped."""
+        grid = self.grid
+        spritedict = self.spritedict
+        for sprite in sprites:
+            if sprite in spritedict:
+                grid.move(sprite, sprite.rect)
+
+    def query(self, rect):
+        """Return the members whose grid cells overlap the given rect."""
+        return self.grid.query(rect)
+
+    def collide(self, rect):
+        """Return the members whose rect overlaps the given rect."""
+        return [sprite for sprite in self.grid.query(rect) if rect.colliderect(sprite.rect)]
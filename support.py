@@ -1,7 +1,9 @@
 from csv import reader  # Import the CSV reader for reading CSV files
 import os  # Import OS module for interacting with the operating system
+import re  # Import re to split file names into text and numbers
 import pygame  # Import Pygame for game development
 from os import walk  # Import walk function for directory traversal
+from settings import *  # Import game settings
 
 def import_csv_layout(path):
     """
@@ -15,17 +17,62 @@ def import_csv_layout(path):
             terrain_map.append(list(row))
     return terrain_map
 
+def natural_key(name):
+    """
+    Return a sort key that orders numbers in names by value, e.g. 'walk2.png' before 'walk10.png'.
+    """
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
 def import_folder(path):
     """
     Import all images from the specified folder.
-    Returns a list of surfaces representing the images.
+    Returns a list of surfaces representing the images, in natural sort order of their file names.
     """
     surface_list = []
     
-    for _, __, img_files in walk(path):
-        for image in img_files:
-            full_path = os.path.join(path, image)
-            image_surf = pygame.image.load(full_path).convert_alpha()
+    for folder, sub_folders, img_files in walk(path):
+        sub_folders.sort(key=natural_key)  # Walk subfolders in a fixed order too
+        for image in sorted(img_files, key=natural_key):
+            full_path = os.path.join(folder, image)
+            image_surf = convert_image(pygame.image.load(full_path))
             surface_list.append(image_surf)
 
     return surface_list
+
+def convert_image(surface, alpha=True):
+    """
+    Convert a surface to the display format for fast blitting.
+    Surfaces are returned unchanged when there is no display (headless mode).
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+def get_display_size():
+    """
+    Return the size of the display surface, or the configured window size when there is no display.
+    """
+    display_surface = pygame.display.get_surface()
+    if display_surface is None:
+        return (WIDTH, HEIGHT)
+    return display_surface.get_size()
+
+def tileset_tile(tileset, value, size=TILESIZE):
+    """
+    Return the tile image for a Tiled tile id, applying the flip flags Tiled stores in its high bits.
+
+    Parameters:
+    - tileset: Surface of the tileset image.
+    - value: Tile id from a CSV layer, with the flip flags (negative values have the horizontal flip set).
+    - size: Width and height of each tile in pixels.
+    """
+    value &= 0xFFFFFFFF
+    tile_id = value & 0x1FFFFFFF
+    columns = tileset.get_width() // size
+    image = tileset.subsurface(((tile_id % columns) * size, (tile_id // columns) * size, size, size))
+    if value & 0x20000000:
+        # Diagonal flip: swap the x and y axes
+        image = pygame.transform.flip(pygame.transform.rotate(image, 90), False, True)
+    if value & 0xC0000000:
+        image = pygame.transform.flip(image, bool(value & 0x80000000), bool(value & 0x40000000))
+    return image
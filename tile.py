@@ -3,6 +3,8 @@ from settings import *  # Import game settings
 import os  # Import OS module for interacting with the operating system
 
 class Tile(pygame.sprite.Sprite):
+    snapshot_fields = ('rect', 'hitbox')  # Attributes restored by LevelSnapshot
+
     def __init__(self, pos, groups, sprite_type, surface=pygame.Surface((TILESIZE, TILESIZE))):
         """
         Initialize a tile sprite.
@@ -13,7 +15,7 @@ class Tile(pygame.sprite.Sprite):
         - sprite_type: Type of the sprite (e.g., 'trees', 'invisible').
         - surface: Surface representing the image of the tile. Defaults to a blank surface of TILESIZE.
         """
-        super().__init__(groups)  # Initialize the sprite with the given groups
+        super().__init__()  # Initialize the sprite; groups are joined once the hitbox exists
         self.sprite_type = sprite_type  # Set the sprite type
         y_offset = HITBOX_OFFSET[sprite_type]  # Get the hitbox offset for the sprite type
         self.image = surface  # Set the image of the tile
@@ -25,3 +27,4 @@ class Tile(pygame.sprite.Sprite):
             self.rect = self.image.get_rect(topleft=pos)
 
         self.hitbox = self.rect.inflate(0, y_offset)  # Inflate the hitbox with the y offset
+        self.add(groups)  # Join the groups last so indexed groups can read the hitbox
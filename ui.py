@@ -1,6 +1,9 @@
 import pygame  # Import Pygame for game development
 from settings import *  # Import game settings
 import os  # Import OS module for interacting with the operating system
+from assets import asset_cache  # Import the shared asset cache
+from profiler import profiler  # Import the frame profiler
+from support import get_display_size  # Import the display size helper
 
 class UI:
     def __init__(self):
@@ -21,115 +24,165 @@ class UI:
         # Convert magic dictionary to graphics
         self.magic_graphics = []
         for magic in magic_data.values():
-            magic = pygame.image.load(magic['graphic']).convert_alpha()
+            magic = asset_cache.image(magic['graphic'])
             self.magic_graphics.append(magic)
             
         # Load the key icon image and enlarge it
-        self.key_image = pygame.image.load(os.path.join('graphics', 'keys', 'key_icon.png')).convert_alpha()
-        self.key_image = pygame.transform.scale(self.key_image, (64, 64))  # Adjust size as needed
+        self.key_image = asset_cache.image(os.path.join('graphics', 'keys', 'key_icon.png'), size=(64, 64))  # Adjust size as needed
 
         # Load the gold icon image
-        self.gold_image = pygame.image.load(os.path.join('graphics', 'gold', 'gold.png')).convert_alpha()
-        self.gold_image = pygame.transform.scale(self.gold_image, (32, 32))  # Adjust size as needed
+        self.gold_image = asset_cache.image(os.path.join('graphics', 'gold', 'gold.png'), size=(32, 32))  # Adjust size as needed
 
-    def show_bar(self, current, max_amount, bg_rect, color):
-        """
-        Display a bar (health or energy) on the screen.
-        """
-        # Draw background
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        # Widget cache: each widget keeps the state it shows and its pre-rendered surface
+        self.widgets = {}
+        self.text_cache = {}
 
-        # Convert stat to pixel ratio
-        ratio = current / max_amount
-        current_width = bg_rect.width * ratio
-        current_rect = bg_rect.copy()
-        current_rect.width = current_width
+        # Static chrome positions, anchored to the bottom-right corner of the screen
+        screen_width, screen_height = get_display_size()
+        self.gold_icon_rect = self.gold_image.get_rect(topleft=(screen_width - 130, screen_height - 50))
+        self.gold_text_anchor = (self.gold_icon_rect.right + 22, self.gold_icon_rect.centery)
+        self.key_icon_rect = self.key_image.get_rect(topleft=(screen_width - 160, screen_height - 115))
+        self.key_text_anchor = (self.key_icon_rect.right + 20, self.key_icon_rect.centery)
 
-        # Draw the bar
-        pygame.draw.rect(self.display_surface, color, current_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        # The upgrade menu prompt never changes, so it is rendered once
+        self.menu_text_surf = self.medium_font.render("(M): Upgrade Menu", False, TEXT_COLOR)
+        self.menu_text_rect = self.menu_text_surf.get_rect(midtop=(screen_width - 100, screen_height - 130))
 
-    def show_gold(self, gold):
+    def widget(self, name, state, build, *args):
         """
-        Display the gold count on the screen.
+        Return the cached blit of a HUD widget, rebuilding it only when its state changes.
+
+        Parameters:
+        - name: Name of the widget.
+        - state: Value the widget shows; the widget is rebuilt when it differs from the cached one.
+        - build: Function taking the state and args and returning the widget surface and its top-left position.
         """
-        # Position the gold icon and text
-        screen_width = self.display_surface.get_size()[0]
-        x_icon = screen_width - 130
-        y_icon = self.display_surface.get_size()[1] - 50
-        gold_icon_rect = self.gold_image.get_rect(topleft=(x_icon, y_icon))
+        cached = self.widgets.get(name)
+        if cached is None or cached[0] != state:
+            cached = (state, build(state, *args))
+            self.widgets[name] = cached
+        return cached[1]
 
-        text_surf = self.font.render(str(int(gold)), False, TEXT_COLOR)
-        text_rect = text_surf.get_rect(midleft=(gold_icon_rect.right + 22, gold_icon_rect.centery))
+    def render_text(self, font, text):
+        """
+        Render text, reusing the surface if the same text was rendered before.
+        """
+        key = (font, text)
+        text_surf = self.text_cache.get(key)
+        if text_surf is None:
+            if len(self.text_cache) >= UI_TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            text_surf = self.text_cache[key] = font.render(text, False, TEXT_COLOR)
+        return text_surf
 
-        # Draw background for text
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, text_rect.inflate(20, 20))
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, text_rect.inflate(20, 20), 3)
+    def opaque_surface(self, size):
+        """Create a surface for an opaque widget, in the display's pixel format when there is one."""
+        surface = pygame.Surface(size)
+        return surface.convert() if pygame.display.get_surface() else surface
 
-        # Blit gold icon and text to the display
-        self.display_surface.blit(self.gold_image, gold_icon_rect)
-        self.display_surface.blit(text_surf, text_rect)
+    def build_bar(self, current_width, bg_rect, color):
+        """
+        Draw a bar (health or energy) filled to a given pixel width.
+        """
+        surface = self.opaque_surface(bg_rect.size)
+        surface.fill(UI_BG_COLOR)
+        pygame.draw.rect(surface, color, (0, 0, current_width, bg_rect.height))
+        pygame.draw.rect(surface, UI_BORDER_COLOR, surface.get_rect(), 3)
+        return surface, bg_rect.topleft
 
-    def show_keys(self, keys):
+    def show_bar(self, name, current, max_amount, bg_rect, color):
         """
-        Display the key count on the screen.
+        Return the blit of a bar (health or energy). The bar is only redrawn when its filled width changes.
         """
-        # Position the key icon
-        screen_width = self.display_surface.get_size()[0]
-        x_icon = screen_width - 160
-        y_icon = self.display_surface.get_size()[1] - 115
-        key_rect = self.key_image.get_rect(topleft=(x_icon, y_icon))
+        # Convert stat to pixel ratio
+        current_width = int(bg_rect.width * current / max_amount)
+        return self.widget(name, current_width, self.build_bar, bg_rect, color)
 
-        # Position the key count text to the right of the key icon
-        text_surf = self.font.render(str(int(keys)), False, TEXT_COLOR)
-        text_rect = text_surf.get_rect(midleft=(key_rect.right + 20, key_rect.centery))
+    def build_count(self, text, anchor):
+        """
+        Draw a count in a bordered box, with the text left-aligned to an anchor point.
+        """
+        text_surf = self.render_text(self.font, text)
+        text_rect = text_surf.get_rect(midleft=anchor)
+        box_rect = text_rect.inflate(20, 20)
 
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, text_rect.inflate(20, 20))
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, text_rect.inflate(20, 20), 3)
-        self.display_surface.blit(self.key_image, key_rect)
-        self.display_surface.blit(text_surf, text_rect)
+        surface = self.opaque_surface(box_rect.size)
+        surface.fill(UI_BG_COLOR)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, surface.get_rect(), 3)
+        surface.blit(text_surf, (text_rect.left - box_rect.left, text_rect.top - box_rect.top))
+        return surface, box_rect.topleft
 
-    def show_upgrade_menu_text(self):
+    def show_gold(self, gold):
         """
-        Display the upgrade menu prompt on the screen.
+        Return the blits of the gold count: the text box and the pre-placed gold icon.
         """
-        text_surf = self.medium_font.render("(M): Upgrade Menu", False, TEXT_COLOR)
-        screen_width = self.display_surface.get_size()[0]
-        text_rect = text_surf.get_rect(midtop=(screen_width - 100, self.display_surface.get_size()[1] - 130))
+        return [self.widget('gold', str(int(gold)), self.build_count, self.gold_text_anchor),
+                (self.gold_image, self.gold_icon_rect)]
 
-        self.display_surface.blit(text_surf, text_rect)
+    def show_keys(self, keys):
+        """
+        Return the blits of the key count: the text box and the pre-placed key icon.
+        """
+        return [self.widget('keys', str(int(keys)), self.build_count, self.key_text_anchor),
+                (self.key_image, self.key_icon_rect)]
 
-    def selection_box(self, left, top, has_switched):
+    def build_magic_box(self, state, left, top):
         """
-        Draw a selection box for items such as weapons or magic.
+        Draw the selection box of the current magic.
         """
-        bg_rect = pygame.Rect(left, top, ITEM_BOX_SIZE, ITEM_BOX_SIZE)
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        magic_index, has_switched = state
+        surface = self.opaque_surface((ITEM_BOX_SIZE, ITEM_BOX_SIZE))
+        surface.fill(UI_BG_COLOR)
         if has_switched:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR_ACTIVE, bg_rect, 3)
+            pygame.draw.rect(surface, UI_BORDER_COLOR_ACTIVE, surface.get_rect(), 3)
         else:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
-        return bg_rect
+            pygame.draw.rect(surface, UI_BORDER_COLOR, surface.get_rect(), 3)
+
+        magic_surf = self.magic_graphics[magic_index]
+        surface.blit(magic_surf, magic_surf.get_rect(center=surface.get_rect().center))
+        return surface, (left, top)
 
     def magic_overlay(self, magic_index, has_switched):
         """
-        Display the current magic selection overlay.
+        Return the blit of the current magic selection overlay.
         """
-        bg_rect = self.selection_box(10, 630, has_switched)
-        magic_surf = self.magic_graphics[magic_index]
-        magic_rect = magic_surf.get_rect(center=bg_rect.center)
-
-        self.display_surface.blit(magic_surf, magic_rect)
+        return self.widget('magic', (magic_index, has_switched), self.build_magic_box, 10, 630)
 
-    def display(self, player):
+    def show_profiler(self):
         """
-        Display all UI elements including bars, gold, keys, and magic.
+        Display the profiler overlay with average section times and counters.
         """
-        self.show_bar(player.health, player.stats['health'], self.health_bar_rect, HEALTH_COLOR)
-        self.show_bar(player.energy, player.stats['energy'], self.energy_bar_rect, ENERGY_COLOR)
+        times, counters, frame_time = profiler.averages()
+        lines = [f'frame {frame_time:6.2f} ms']
+        lines += [f'{name} {value:6.2f} ms' for name, value in times.items()]
+        lines += [f'{name} {value:.0f}' for name, value in counters.items()]
+
+        # Draw a panel in the top-right corner with one line per entry
+        line_height = self.medium_font.get_linesize()
+        screen_width = self.display_surface.get_size()[0]
+        panel_rect = pygame.Rect(screen_width - 330, 10, 320, line_height * len(lines) + 20)
+        pygame.draw.rect(self.display_surface, UI_BG_COLOR, panel_rect)
+        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, panel_rect, 3)
 
-        self.show_gold(player.gold)
-        self.show_keys(player.keys)
-        self.show_upgrade_menu_text()
+        for index, line in enumerate(lines):
+            text_surf = self.medium_font.render(line, False, TEXT_COLOR)
+            self.display_surface.blit(text_surf, (panel_rect.left + 10, panel_rect.top + 10 + index * line_height))
 
-        self.magic_overlay(player.magic_index, not player.can_switch_magic)
+    def display(self, player):
+        """
+        Display all UI elements including bars, gold, keys, and magic.
+        Widgets are cached and only re-rendered when the value they show changes,
+        so an unchanged HUD is a single batch of blits.
+        """
+        hud = [
+            self.show_bar('health', player.health, player.stats['health'], self.health_bar_rect, HEALTH_COLOR),
+            self.show_bar('energy', player.energy, player.stats['energy'], self.energy_bar_rect, ENERGY_COLOR)
+        ]
+        hud += self.show_gold(player.gold)
+        hud += self.show_keys(player.keys)
+        hud.append((self.menu_text_surf, self.menu_text_rect))
+        hud.append(self.magic_overlay(player.magic_index, not player.can_switch_magic))
+        self.display_surface.blits(hud, doreturn=False)
+
+        if profiler.overlay_visible:
+            self.show_profiler()
@@ -1,25 +1,29 @@
 import pygame  # Import Pygame for game development
 from settings import *  # Import game settings
 import os  # Import OS module for interacting with the operating system
+from support import get_display_size, convert_image  # Import the display helpers
+from assets import asset_cache  # Import the shared asset cache
 
 class Upgrade:
-    def __init__(self, player):
+    def __init__(self, player, input_source, clock):
         """
         Initialize the Upgrade class.
         """
         # General setup
         self.display_surface = pygame.display.get_surface()  # Get the display surface
+        self.display_size = get_display_size()  # Window size, also available without a display
         self.player = player  # Reference to the player object
+        self.input_source = input_source  # Keyboard or scripted key state
+        self.clock = clock  # Simulation clock for the selection cooldown
         self.attribute_nr = len(player.stats)  # Number of attributes
         self.attribute_names = list(player.stats.keys())  # Names of the attributes
         self.max_values = list(player.max_stats.values())  # Maximum values of the attributes
         self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)  # Set the font for UI text
-        self.gold_image = pygame.image.load('graphics/gold/gold.png').convert_alpha()  # Load the gold icon image
-        self.gold_image = pygame.transform.scale(self.gold_image, (20, 20))  # Resize the gold icon image
+        self.gold_image = asset_cache.image(os.path.join('graphics', 'gold', 'gold.png'), size=(20, 20))  # Load the resized gold icon
 
         # Item creation
-        self.height = self.display_surface.get_size()[1] * 0.8  # Height of each item
-        self.width = self.display_surface.get_size()[0] // 6  # Width of each item
+        self.height = self.display_size[1] * 0.8  # Height of each item
+        self.width = self.display_size[0] // 6  # Width of each item
         self.create_items()  # Create the items
 
         # Selection system
@@ -31,21 +35,21 @@ class Upgrade:
         """
         Handle user input for navigating the upgrade menu.
         """
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
 
         if self.can_move:
             if keys[pygame.K_RIGHT] and self.selection_index < self.attribute_nr - 1:
                 self.selection_index += 1
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = self.clock.get_ticks()
             elif keys[pygame.K_LEFT] and self.selection_index >= 1:
                 self.selection_index -= 1
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = self.clock.get_ticks()
 
             if keys[pygame.K_SPACE]:
                 self.can_move = False
-                self.selection_time = pygame.time.get_ticks()
+                self.selection_time = self.clock.get_ticks()
                 self.item_list[self.selection_index].trigger(self.player)
 
     def selection_cooldown(self):
@@ -53,7 +57,7 @@ class Upgrade:
         Handle the cooldown between selections to prevent rapid switching.
         """
         if not self.can_move:
-            current_time = pygame.time.get_ticks()
+            current_time = self.clock.get_ticks()
             if current_time - self.selection_time >= 300:
                 self.can_move = True
 
@@ -65,31 +69,34 @@ class Upgrade:
 
         for item, index in enumerate(range(self.attribute_nr)):
             # Horizontal position
-            full_width = self.display_surface.get_size()[0]
+            full_width = self.display_size[0]
             increment = full_width // self.attribute_nr
             left = (item * increment) + (increment - self.width) // 2
 
             # Vertical position
-            top = self.display_surface.get_size()[1] * 0.1
+            top = self.display_size[1] * 0.1
 
             # Create the item object
             item = Item(left, top, self.width, self.height, index, self.font)
             self.item_list.append(item)
 
-    def display(self):
+    def update(self):
         """
-        Display the upgrade menu and handle user input.
+        Handle user input and the selection cooldown for one simulation tick.
         """
         self.input()
         self.selection_cooldown()
 
-        for index, item in enumerate(self.item_list):
-            # Get attributes
-            name = self.attribute_names[index]
-            value = self.player.get_value_by_index(index)
-            max_value = self.max_values[index]
-            cost = self.player.get_cost_by_index(index)
-            item.display(self.display_surface, self.selection_index, name, value, max_value, cost, self.gold_image)
+    def display(self):
+        """
+        Display the upgrade menu. Items are only redrawn when their stat, cost or selection changes.
+        """
+        stats = self.player.stats
+        upgrade_cost = self.player.upgrade_cost
+        self.display_surface.blits([
+            item.display(self.selection_index, name, stats[name], max_value, upgrade_cost[name], self.gold_image)
+            for item, name, max_value in zip(self.item_list, self.attribute_names, self.max_values)
+        ], doreturn=False)
 
 class Item:
     def __init__(self, l, t, w, h, index, font):
@@ -107,24 +114,26 @@ class Item:
         self.rect = pygame.Rect(l, t, w, h)  # Rectangle representing the item's area
         self.index = index  # Index of the item
         self.font = font  # Font used for rendering text
+        self.surfaces = {}  # Cached (value and cost, surface) of the selected and unselected variants
 
     def display_names(self, surface, name, cost, selected, gold_image):
         """
-        Display the name and cost of the upgrade item.
+        Display the name and cost of the upgrade item on the item's own surface.
         """
         color = TEXT_COLOR_SELECTED if selected else TEXT_COLOR
+        rect = surface.get_rect()
 
         # Title
         title_surf = self.font.render(name, False, color)
-        title_rect = title_surf.get_rect(midtop=self.rect.midtop + pygame.math.Vector2(0, 20))
+        title_rect = title_surf.get_rect(midtop=(rect.centerx, rect.top + 20))
 
         # Cost
         cost_surf = self.font.render(f'{int(cost)}', False, color)
-        cost_rect = cost_surf.get_rect(midbottom=self.rect.midbottom - pygame.math.Vector2(0, 20))
+        cost_rect = cost_surf.get_rect(midbottom=(rect.centerx, rect.bottom - 20))
 
         # Gold image
-        gold_image_rect = gold_image.get_rect(midbottom=self.rect.midbottom - pygame.math.Vector2(35, 20))
-        
+        gold_image_rect = gold_image.get_rect(midbottom=(rect.centerx - 35, rect.bottom - 20))
+
         # Draw elements
         surface.blit(title_surf, title_rect)
         surface.blit(gold_image, gold_image_rect)
@@ -132,11 +141,12 @@ class Item:
 
     def display_bar(self, surface, value, max_value, selected):
         """
-        Display the progress bar representing the attribute's value.
+        Display the progress bar representing the attribute's value on the item's own surface.
         """
         # Drawing setup
-        top = self.rect.midtop + pygame.math.Vector2(0, 60)
-        bottom = self.rect.midbottom - pygame.math.Vector2(0, 60)
+        rect = surface.get_rect()
+        top = (rect.centerx, rect.top + 60)
+        bottom = (rect.centerx, rect.bottom - 60)
         color = BAR_COLOR_SELECTED if selected else BAR_COLOR
 
         # Bar setup
@@ -152,7 +162,7 @@ class Item:
         """
         Trigger the upgrade for the player's attribute.
         """
-        upgrade_attribute = list(player.stats.keys())[self.index]
+        upgrade_attribute = player.stat_names[self.index]
         
         if player.gold >= player.upgrade_cost[upgrade_attribute] and player.stats[upgrade_attribute] < player.max_stats[upgrade_attribute]:
             player.gold -= player.upgrade_cost[upgrade_attribute]
@@ -162,16 +172,29 @@ class Item:
         if player.stats[upgrade_attribute] > player.max_stats[upgrade_attribute]:
             player.stats[upgrade_attribute] = player.max_stats[upgrade_attribute]
 
-    def display(self, surface, selection_num, name, value, max_value, cost, gold_image):
+    def render(self, selected, name, value, max_value, cost, gold_image):
         """
-        Display the upgrade item, including its name, cost, and progress bar.
+        Render the upgrade item, including its name, cost, and progress bar, to a new surface.
         """
-        if self.index == selection_num:
-            pygame.draw.rect(surface, UPGRADE_BG_COLOR_SELECTED, self.rect)
-            pygame.draw.rect(surface, UI_BORDER_COLOR, self.rect, 4)
+        surface = convert_image(pygame.Surface(self.rect.size), alpha=False)
+        if selected:
+            surface.fill(UPGRADE_BG_COLOR_SELECTED)
         else:
-            pygame.draw.rect(surface, UI_BG_COLOR, self.rect)
-            pygame.draw.rect(surface, UI_BORDER_COLOR, self.rect, 4)
+            surface.fill(UI_BG_COLOR)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, surface.get_rect(), 4)
+
+        self.display_names(surface, name, cost, selected, gold_image)
+        self.display_bar(surface, value, max_value, selected)
+        return surface
 
-        self.display_names(surface, name, cost, self.index == selection_num, gold_image)
-        self.display_bar(surface, value, max_value, self.index == selection_num)
+    def display(self, selection_num, name, value, max_value, cost, gold_image):
+        """
+        Return the blit of the upgrade item.
+        The selected and unselected variants are cached and redrawn only when the value or cost changes.
+        """
+        selected = self.index == selection_num
+        cached = self.surfaces.get(selected)
+        if cached is None or cached[0] != (value, cost):
+            cached = ((value, cost), self.render(selected, name, value, max_value, cost, gold_image))
+            self.surfaces[selected] = cached
+        return cached[1], self.rect
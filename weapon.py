@@ -1,4 +1,5 @@
 import pygame 
+from assets import asset_cache  # Import the shared asset cache
 
 class Weapon(pygame.sprite.Sprite):
     def __init__(self, player, groups):
@@ -16,7 +17,7 @@ class Weapon(pygame.sprite.Sprite):
         # Load the weapon graphic
         full_path = f'graphics/weapons/{player.weapon}.png'
         try:
-            self.image = pygame.image.load(full_path).convert_alpha()  # Load the weapon image
+            self.image = asset_cache.image(full_path)  # Load the weapon image once and reuse it
         except pygame.error as e:
             print(f"Cannot load image: {full_path}")
             raise SystemExit(e)